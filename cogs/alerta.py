@@ -1,18 +1,22 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import matplotlib.pyplot as plt
 import io
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 from discord.ui import Button, View
-import aiohttp
 import asyncio
 import re
-from difflib import get_close_matches
-import pickle
 import os
-from typing import Dict, Tuple, Any, Literal
+import itertools
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Tuple, Any, Literal, Optional
+from utils.price_history import PriceHistoryStore
+from utils.charts import ChartCache, ChartRenderer, chart_key
+from utils.name_index import PrefixIndex, TrigramIndex, normalize
+from utils.catalog import ItemCatalog
+from utils.downloader import CatalogDownloader
+from cogs.item import ITEMS_MAP, ITEM_ALIASES
 
 def parse_coins(coin_str: str) -> int:
     """Convierte un string en formato XgYsZc a copper_amount"""
@@ -48,97 +52,207 @@ def format_coins(copper_amount: int) -> str:
     return "".join(parts)
 
 class PriceView(View):
-    def __init__(self, item_name):
+    def __init__(self, item_name, item_id, history_store: PriceHistoryStore, on_stop=None):
         super().__init__(timeout=None)
         self.item_name = item_name
+        self.item_id = item_id
+        self.history_store = history_store
+        self.on_stop = on_stop
 
     @discord.ui.button(label="Detener monitoreo", style=discord.ButtonStyle.danger)
     async def stop_monitoring(self, interaction: discord.Interaction, button: Button):
+        if self.on_stop:
+            self.on_stop()
         await interaction.response.send_message(f"Monitoreo detenido para {self.item_name}")
         self.stop()
 
     @discord.ui.button(label="Ver historial", style=discord.ButtonStyle.primary)
     async def show_history(self, interaction: discord.Interaction, button: Button):
-        try:
-            with open(f"price_history_{self.item_name.lower().replace(' ', '_')}.json", 'r') as f:
-                history = json.load(f)
-                formatted_history = []
-                for entry in history:
-                    formatted_entry = entry.copy()
-                    formatted_entry['buy_price'] = format_coins(int(entry['buy_price']))
-                    formatted_entry['sell_price'] = format_coins(int(entry['sell_price']))
-                    formatted_history.append(formatted_entry)
-                await interaction.response.send_message(
-                    f"Historial de precios para {self.item_name}:\n```json\n{json.dumps(formatted_history, indent=2)}```"
-                )
-        except FileNotFoundError:
+        # Solo los últimos puntos para no pasar el límite de 2000 caracteres de Discord
+        history = await self.history_store.range(self.item_id, limit=10)
+        if not history:
             await interaction.response.send_message("No hay historial disponible todavía.")
+            return
+
+        formatted_history = []
+        for entry in history:
+            formatted_entry = entry.copy()
+            formatted_entry['buy_price'] = format_coins(int(entry['buy_price']))
+            formatted_entry['sell_price'] = format_coins(int(entry['sell_price']))
+            formatted_history.append(formatted_entry)
+        await interaction.response.send_message(
+            f"Historial de precios para {self.item_name}:\n```json\n{json.dumps(formatted_history, indent=2)}```"
+        )
 
 class GW2PriceMonitor:
     def __init__(self, bot):
         self.base_url = "https://api.guildwars2.com/v2"
         self.bot = bot
-        self.price_history = {}
+        self.history_store = PriceHistoryStore(os.getenv('PRICE_HISTORY_DB', 'price_history.db'))
+        self.history_window = timedelta(days=7)
+        self.charts = ChartRenderer(max_workers=int(os.getenv('CHART_WORKERS', 2)))
+        self.chart_cache = ChartCache(self.charts, max_bytes=int(os.getenv('CHART_CACHE_BYTES', 32 * 1024 * 1024)))
         self.session = None
-        self.items_cache: Dict[str, Tuple[int, Any]] = {}
-        self.items_cache_es: Dict[str, Tuple[int, Any]] = {}
+        self.catalog: Optional[ItemCatalog] = None
+        self.name_index = TrigramIndex()
+        # Mientras no haya catálogo se autocompleta con los nombres de ITEMS_MAP
+        self.prefix_index = PrefixIndex(self.items_map_entries())
         self.initialized = False
-        self.cache_file = "items_cache.pkl"
+        # Estado del catálogo: 'cold' -> 'warming' -> 'ready' (o 'failed', que permite reintentar)
+        self.state = 'cold'
+        self.warmup_task: Optional[asyncio.Task] = None
+        # Índice siempre disponible con los nombres de ITEMS_MAP para responder durante la carga
+        self.static_index = self.build_static_index()
+        self.cache_file = os.getenv('ITEM_CATALOG_PATH', 'items_catalog.bin')
         self.cache_expiry = 24 * 60 * 60  # 24 horas en segundos
+        self.checkpoint_file = f"{self.cache_file}.partial"
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.alerts = PriceAlertEngine(self)
+
+    def close(self):
+        """Detiene las tareas en segundo plano y libera el catálogo, el historial y los gráficos"""
+        for task in (self.warmup_task, self.refresh_task, self.alerts.task):
+            if task is not None:
+                task.cancel()
+        self.charts.close()
+        self.history_store.close()
+        if self.catalog is not None:
+            self.catalog.close()
+            self.catalog = None
 
     async def create_session(self):
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
+        # Usa el pool de conexiones compartido del bot
+        self.session = self.bot.gw2.session
 
     def load_cache_from_file(self) -> bool:
-        """Carga el caché desde el archivo si existe y no ha expirado"""
+        """Abre el catálogo en disco si existe (aunque haya expirado)"""
         try:
             if not os.path.exists(self.cache_file):
                 return False
                 
-            # Verificar si el caché ha expirado
-            if (datetime.now().timestamp() - os.path.getmtime(self.cache_file)) > self.cache_expiry:
-                return False
-                
-            with open(self.cache_file, 'rb') as f:
-                cached_data = pickle.load(f)
-                self.items_cache = cached_data['en']
-                self.items_cache_es = cached_data['es']
-                return True
+            # mmap: abrir no deserializa nada, las páginas se leen al consultarlas
+            self.catalog = ItemCatalog.open(self.cache_file)
+            return self.catalog is not None
         except Exception as e:
             print(f"Error loading cache: {e}")
             return False
 
-    def save_cache_to_file(self):
-        """Guarda el caché en un archivo"""
+    def save_cache_to_file(self, items: Iterable[dict]) -> bool:
+        """Escribe el catálogo compacto (reemplazo atómico del archivo)"""
         try:
-            with open(self.cache_file, 'wb') as f:
-                pickle.dump({
-                    'en': self.items_cache,
-                    'es': self.items_cache_es
-                }, f)
+            ItemCatalog.write(self.cache_file, items)
+            return True
         except Exception as e:
             print(f"Error saving cache: {e}")
+            return False
+
+    def swap_catalog(self, catalog: ItemCatalog):
+        old_catalog, self.catalog = self.catalog, catalog
+        if old_catalog is not None:
+            old_catalog.close()
+
+    @staticmethod
+    def catalog_entry(item: dict, lang: str) -> dict:
+        """Solo las columnas del catálogo, no el JSON completo del item"""
+        if lang == 'en':
+            return {
+                'id': item['id'],
+                'name_en': item['name'],
+                'icon': item.get('icon'),
+                'rarity': item.get('rarity'),
+                'type': item.get('type')
+            }
+        return {'id': item['id'], f'name_{lang}': item['name']}
+
+    async def build_name_index(self):
+        """Construye el índice de trigramas fuera del event loop y lo reemplaza de una vez"""
+        catalog = self.catalog
+        self.name_index = await asyncio.to_thread(
+            lambda: TrigramIndex.build(
+                name.lower() for lang in ('en', 'es') for _, name in catalog.names(lang)
+            )
+        )
+
+    @staticmethod
+    def items_map_entries() -> List[Tuple[str, str]]:
+        entries = []
+        for item in ITEMS_MAP.values():
+            entries.append((item['mainName'], item['mainName']))
+            for alt_name in item.get('altNames', []):
+                entries.append((f"{alt_name} ({item['mainName']})", item['mainName']))
+        return entries
+
+    def autocomplete_entries(self) -> List[Tuple[str, str]]:
+        entries = self.items_map_entries()
+        for lang in ('en', 'es'):
+            for _, name in self.catalog.names(lang):
+                # Discord limita nombre y valor de cada opción a 100 caracteres
+                if len(name) <= 100:
+                    entries.append((name, name))
+        return entries
+
+    async def build_prefix_index(self):
+        """Construye el índice de autocompletado en un hilo y lo reemplaza de una vez"""
+        self.prefix_index = await asyncio.to_thread(lambda: PrefixIndex(self.autocomplete_entries()))
+
+    def catalog_is_stale(self) -> bool:
+        return (datetime.now().timestamp() - os.path.getmtime(self.cache_file)) > self.cache_expiry
+
+    async def fetch_item_ids(self) -> Optional[List[int]]:
+        async with self.session.get(f"{self.base_url}/items") as response:
+            if response.status != 200:
+                print(f"Error al obtener lista de items: {response.status}")
+                return None
+            return await response.json()
+
+    async def download_items(self, item_ids: List[int]) -> Dict[int, dict]:
+        """Descarga los datos básicos de los ids indicados en ambos idiomas"""
+        downloader = CatalogDownloader(self.session, self.base_url, checkpoint_path=self.checkpoint_file)
+        results = await downloader.run(item_ids, ('en', 'es'), transform=self.catalog_entry)
+
+        items: Dict[int, dict] = {}
+        for lang_items in results.values():
+            for item_id, entry in lang_items.items():
+                items.setdefault(item_id, {}).update(entry)
+        return items
+
+    async def publish_catalog(self, items: Iterable[dict]) -> bool:
+        """Escribe el nuevo catálogo fuera del loop y lo reemplaza de una sola vez"""
+        if not await asyncio.to_thread(self.save_cache_to_file, items):
+            return False
+        self.swap_catalog(ItemCatalog.open(self.cache_file))
+        # El catálogo ya contiene todo lo descargado: el checkpoint no hace falta
+        if os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+        # Los índices se reconstruyen desde el catálogo publicado: así no quedan ids eliminados
+        await self.build_name_index()
+        await self.build_prefix_index()
+        return True
 
-    async def fetch_items_chunk(self, chunk: list, lang: str = 'en') -> None:
-        """Obtiene información detallada para un grupo de items"""
+    @staticmethod
+    def build_static_index() -> Dict[str, Tuple[int, dict]]:
+        # Reutiliza el índice de alias de cogs/item.py (mismas claves normalizadas)
+        return {
+            alias: (item_id, {'id': item_id, 'name': ITEMS_MAP[item_id]['mainName']})
+            for alias, item_id in ITEM_ALIASES.items()
+        }
+
+    def start_warmup(self) -> asyncio.Task:
+        """Lanza la carga del catálogo en segundo plano; todas las llamadas comparten la misma tarea"""
+        if self.warmup_task is None or (self.warmup_task.done() and not self.initialized):
+            self.warmup_task = asyncio.create_task(self.warm_up())
+        return self.warmup_task
+
+    async def warm_up(self):
+        self.state = 'warming'
         try:
-            ids_str = ','.join(map(str, chunk))
-            url = f"{self.base_url}/items?ids={ids_str}"
-            if lang != 'en':
-                url += f"&lang={lang}"
-                
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    items = await response.json()
-                    cache_to_use = self.items_cache if lang == 'en' else self.items_cache_es
-                    
-                    for item in items:
-                        cache_to_use[item['name'].lower()] = (item['id'], item)
-                else:
-                    print(f"Error fetching items chunk: {response.status}")
-        except Exception as e:
-            print(f"Error in fetch_items_chunk: {e}")
+            await self.initialize_cache()
+        finally:
+            self.state = 'ready' if self.initialized else 'failed'
+        if self.state == 'ready':
+            print("✅ Catálogo de items listo")
+        else:
+            print("❌ No se pudo cargar el catálogo de items")
 
     async def initialize_cache(self):
         """Inicializa el caché de items de manera eficiente"""
@@ -147,41 +261,26 @@ class GW2PriceMonitor:
 
         print("Iniciando carga del caché de items...")
         
-        # Intentar cargar desde archivo primero
+        # Un catálogo viejo se sigue usando mientras se actualiza en segundo plano
         if self.load_cache_from_file():
             print("Caché cargado desde archivo")
+            await self.build_name_index()
+            await self.build_prefix_index()
             self.initialized = True
+            self.start_refresh()
             return
 
         await self.create_session()
         
         try:
-            # Obtener lista de IDs
-            async with self.session.get(f"{self.base_url}/items") as response:
-                if response.status != 200:
-                    print(f"Error al obtener lista de items: {response.status}")
-                    return
-                all_item_ids = await response.json()
-
-            # Procesar items en chunks
-            chunk_size = 200
-            chunks = [all_item_ids[i:i + chunk_size] for i in range(0, len(all_item_ids), chunk_size)]
-            
-            # Crear tareas para ambos idiomas
-            tasks = []
-            for chunk in chunks:
-                tasks.append(self.fetch_items_chunk(chunk, 'en'))
-                tasks.append(self.fetch_items_chunk(chunk, 'es'))
-            
-            # Ejecutar tareas en grupos para evitar sobrecarga
-            batch_size = 5
-            for i in range(0, len(tasks), batch_size):
-                batch = tasks[i:i + batch_size]
-                await asyncio.gather(*batch)
-                print(f"Progreso: {min(i + batch_size, len(tasks))}/{len(tasks)} tareas completadas")
+            all_item_ids = await self.fetch_item_ids()
+            if all_item_ids is None:
+                return
+            items = await self.download_items(all_item_ids)
             
-            # Guardar caché en archivo
-            self.save_cache_to_file()
+            # Guardar caché en archivo y abrirlo
+            if not await self.publish_catalog(items.values()):
+                return
             
             print("Caché de items completado")
             self.initialized = True
@@ -189,79 +288,113 @@ class GW2PriceMonitor:
         except Exception as e:
             print(f"Error durante la inicialización del caché: {e}")
 
+    def start_refresh(self):
+        """Lanza la actualización incremental si el catálogo expiró (nunca dos a la vez)"""
+        if self.catalog is None or not self.catalog_is_stale():
+            return
+        if self.refresh_task is None or self.refresh_task.done():
+            self.refresh_task = asyncio.create_task(self.refresh_catalog())
+
+    async def refresh_catalog(self):
+        """Descarga solo los ids nuevos y descarta los eliminados; las búsquedas siguen sobre el catálogo actual"""
+        await self.create_session()
+        try:
+            current_ids = await self.fetch_item_ids()
+            if current_ids is None:
+                return
+            catalog = self.catalog
+            known_ids = set(catalog.ids())
+            current = set(current_ids)
+            new_ids = sorted(current - known_ids)
+            removed_ids = known_ids - current
+
+            if not new_ids and not removed_ids:
+                # Nada cambió: se renueva la fecha del archivo para reiniciar la expiración
+                os.utime(self.cache_file)
+                print("Catálogo de items al día")
+                return
+
+            print(f"Actualizando catálogo: {len(new_ids)} items nuevos, {len(removed_ids)} eliminados")
+            new_items = await self.download_items(new_ids)
+            items = await asyncio.to_thread(
+                lambda: [row for row in catalog.rows() if row['id'] not in removed_ids] + list(new_items.values())
+            )
+            if await self.publish_catalog(items):
+                print("Catálogo de items actualizado")
+        except Exception as e:
+            print(f"Error actualizando el catálogo de items: {e}")
+
     async def get_item_id(self, item_name: str) -> Tuple[int, Any]:
-        """Busca un item por nombre y retorna su ID y detalles"""
+        """Busca un item por nombre y retorna su ID y datos básicos"""
         if not self.initialized:
-            print("Inicializando caché...")
-            await self.initialize_cache()
+            # Nunca se espera al catálogo: mientras carga se responde con ITEMS_MAP
+            self.start_warmup()
+            return self.static_index.get(normalize(item_name), (None, None))
+        self.start_refresh()
             
         item_name_lower = item_name.lower()
         
         # Búsqueda exacta
-        if item_name_lower in self.items_cache:
-            return self.items_cache[item_name_lower]
-        if item_name_lower in self.items_cache_es:
-            return self.items_cache_es[item_name_lower]
+        row = self.catalog.find(item_name_lower, 'en')
+        if row is None:
+            row = self.catalog.find(item_name_lower, 'es')
             
-        # Búsqueda aproximada
-        all_names = list(self.items_cache.keys()) + list(self.items_cache_es.keys())
-        matches = get_close_matches(item_name_lower, all_names, n=1, cutoff=0.8)
+        # Búsqueda aproximada sobre el índice de trigramas
+        if row is None:
+            matches = self.name_index.search(item_name_lower, n=1, cutoff=0.8)
+            if matches:
+                row = self.catalog.find(matches[0], 'en')
+                if row is None:
+                    row = self.catalog.find(matches[0], 'es')
         
-        if matches:
-            matched_name = matches[0]
-            return (self.items_cache.get(matched_name) or 
-                   self.items_cache_es.get(matched_name))
-            
-        return None, None
+        if row is None:
+            return None, None
+        item = self.catalog.summary(row)
+        return item['id'], item
 
-    async def get_current_price(self, item_id):
-        await self.create_session()
-        async with self.session.get(f"{self.base_url}/commerce/prices/{item_id}") as response:
-            if response.status == 200:
-                data = await response.json()
-                return {
-                    'buy_price': data['buys']['unit_price'],
-                    'sell_price': data['sells']['unit_price']
-                }
-        return None
-
-    def save_price_history(self, item_name, price_data):
-        filename = f"price_history_{item_name.lower().replace(' ', '_')}.json"
-        try:
-            with open(filename, 'r') as f:
-                history = json.load(f)
-        except FileNotFoundError:
-            history = []
-            
+    async def get_current_prices(self, item_ids) -> Dict[int, dict]:
+        """Precios actuales de varios ítems en una sola petición ?ids= (vía el batcher compartido)"""
+        prices = await self.bot.gw2.prices.get_many(item_ids)
+        return {
+            item_id: {
+                'buy_price': data['buys']['unit_price'],
+                'sell_price': data['sells']['unit_price']
+            }
+            for item_id, data in prices.items() if data
+        }
+
+    async def save_price_history(self, item_id, price_data):
+        """Agrega una muestra al historial y retorna la ventana reciente para el gráfico"""
+        now = datetime.now()
+        await self.history_store.append(item_id, price_data['buy_price'], price_data['sell_price'], now)
+        return await self.history_store.range(item_id, start=now - self.history_window)
+
+    async def load_price_history(self, item_id, price_data):
+        """Ventana reciente del historial más la muestra actual, sin guardarla"""
+        now = datetime.now()
+        history = await self.history_store.range(item_id, start=now - self.history_window)
         history.append({
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'buy_price': price_data['buy_price'],
             'sell_price': price_data['sell_price']
         })
-        
-        with open(filename, 'w') as f:
-            json.dump(history, f, indent=2)
-            
         return history
 
-    async def create_price_chart(self, item_name, history):
-        plt.figure(figsize=(10, 6))
-        dates = [datetime.fromisoformat(entry['timestamp']) for entry in history]
-        prices = [entry['sell_price'] / 10000 for entry in history]
-        
-        plt.plot(dates, prices, marker='o')
-        plt.title(f'Tendencia de precios para {item_name}')
-        plt.xlabel('Fecha')
-        plt.ylabel('Precio (oro)')
-        plt.xticks(rotation=45)
-        plt.grid(True)
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-        
-        return buf
+    async def create_price_chart(self, item_id, item_name, history, price_type: str = 'sell') -> bytes:
+        """Retorna el PNG del gráfico; cada serie distinta se renderiza una sola vez"""
+        price_key = 'buy_price' if price_type == 'buy' else 'sell_price'
+        dates = [datetime.fromisoformat(entry['timestamp']).timestamp() for entry in history]
+        prices = [entry[price_key] / 10000 for entry in history]
+        style = {
+            'title': f'Tendencia de precios para {item_name}',
+            'xlabel': 'Fecha',
+            'ylabel': 'Precio (oro)',
+            'width': 10,
+            'height': 6
+        }
+        # La clave cubre ítem, tipo de precio, ventana de la serie y dimensiones
+        key = chart_key(item_id, price_type, dates[:1], dates[-1:], len(dates), prices, sorted(style.items()))
+        return await self.chart_cache.get_or_render(key, dates, prices, **style)
 
     async def create_price_embed(self, item_details, current_prices, target_price, history, price_type: str):
         price_key = 'buy_price' if price_type == 'buy' else 'sell_price'
@@ -272,7 +405,7 @@ class GW2PriceMonitor:
             color=discord.Color.blue() if current_price > target_price else discord.Color.green()
         )
         
-        if 'icon' in item_details:
+        if item_details.get('icon'):
             embed.set_thumbnail(url=item_details['icon'])
             
         embed.add_field(
@@ -307,7 +440,8 @@ class GW2PriceMonitor:
         embed.set_footer(text=f"Actualizado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         return embed
 
-    async def monitor_price(self, user_id: int, item_name: str, target_price: int, price_type: str, check_interval: int = 300):
+    async def monitor_price(self, user_id: int, item_name: str, target_price: int, price_type: str):
+        """Registra un monitoreo en el motor de alertas; ya no hay un bucle por usuario"""
         await self.create_session()
         item_id, item_details = await self.get_item_id(item_name)
         if not item_id:
@@ -317,45 +451,159 @@ class GW2PriceMonitor:
         if not user:
             return "No se pudo encontrar el usuario en Discord"
 
-        view = PriceView(item_name)
         initial_message = await user.send(f"🔍 Iniciando monitoreo ({price_type.upper()}) para **{item_name}**...")
+        watch = PriceWatch(user, initial_message, item_id, item_details, item_name, target_price, price_type)
+        watch.view = PriceView(item_name, item_id, self.history_store, on_stop=lambda: self.alerts.remove(watch))
+        await self.alerts.add(watch)
 
+class PriceWatch:
+    """Un usuario esperando que un ítem llegue a su precio objetivo"""
+    def __init__(self, user, message, item_id, item_details, item_name, target_price, price_type):
+        self.user = user
+        self.message = message
+        self.item_id = item_id
+        self.item_details = item_details
+        self.item_name = item_name
+        self.target_price = target_price
+        self.price_type = price_type
+        self.view = None
+        self.watch_id = None
+
+class PriceAlertEngine:
+    """Motor único de alertas: consulta cada ítem vigilado una vez por ciclo con peticiones ?ids=.
+
+    Los objetivos se indexan por ítem en listas ordenadas de (precio, watch_id), de modo que
+    con cada precio nuevo las alertas disparadas se encuentran por bisección:
+    - buy: se dispara cuando buy_price >= objetivo -> prefijo de la lista
+    - sell: se dispara cuando sell_price <= objetivo -> sufijo de la lista
+    """
+    def __init__(self, monitor: GW2PriceMonitor, check_interval: int = 300):
+        self.monitor = monitor
+        self.check_interval = check_interval
+        self.watches: Dict[int, PriceWatch] = {}
+        self.buy_targets: Dict[int, List[Tuple[int, int]]] = {}
+        self.sell_targets: Dict[int, List[Tuple[int, int]]] = {}
+        self.ids = itertools.count()
+        self.task = None
+
+    def targets_for(self, watch: PriceWatch) -> Dict[int, List[Tuple[int, int]]]:
+        return self.buy_targets if watch.price_type == 'buy' else self.sell_targets
+
+    async def add(self, watch: PriceWatch):
+        watch.watch_id = next(self.ids)
+        self.watches[watch.watch_id] = watch
+        insort(self.targets_for(watch).setdefault(watch.item_id, []), (watch.target_price, watch.watch_id))
         try:
-            while True:
-                current_prices = await self.get_current_price(item_id)
-                if current_prices:
-                    history = self.save_price_history(item_name, current_prices)
-                    chart_buffer = await self.create_price_chart(item_name, history)
-                    embed = await self.create_price_embed(item_details, current_prices, target_price, history, price_type)
-                    
-                    file = discord.File(chart_buffer, filename="price_trend.png")
-                    embed.set_image(url="attachment://price_trend.png")
-                    
-                    await initial_message.edit(content=None, embed=embed, attachments=[file], view=view)
-                    
-                    current_price = current_prices['buy_price'] if price_type == 'buy' else current_prices['sell_price']
-                    price_condition = (current_price >= target_price if price_type == 'buy' else current_price <= target_price)
-                    
-                    if price_condition:
-                        alert_embed = discord.Embed(
-                            title="🎯 ¡Precio objetivo alcanzado!",
-                            description=f"El precio de **{item_name}** ha llegado a tu objetivo ({price_type.upper()})",
-                            color=discord.Color.green()
-                        )
-                        await user.send(embed=alert_embed)
-                        break
-                        
-                await asyncio.sleep(check_interval)
-                
+            # Primera actualización inmediata solo para este monitoreo
+            await self.check_items([watch.item_id], only=watch)
+        except Exception:
+            # Si la primera consulta falla el monitoreo no queda activo
+            self.remove(watch)
+            raise
+        if self.watches and (self.task is None or self.task.done()):
+            self.task = asyncio.create_task(self.run())
+
+    def remove(self, watch: PriceWatch):
+        if self.watches.pop(watch.watch_id, None) is None:
+            return
+        targets = self.targets_for(watch)
+        entries = targets.get(watch.item_id, [])
+        index = bisect_left(entries, (watch.target_price, watch.watch_id))
+        if index < len(entries) and entries[index] == (watch.target_price, watch.watch_id):
+            entries.pop(index)
+        if not entries:
+            targets.pop(watch.item_id, None)
+
+    def triggered(self, item_id: int, prices: dict) -> List[PriceWatch]:
+        """Retorna los monitoreos cuyo objetivo se alcanzó con estos precios"""
+        buys = self.buy_targets.get(item_id, [])
+        sells = self.sell_targets.get(item_id, [])
+        hits = buys[:bisect_right(buys, (prices['buy_price'], float('inf')))]
+        hits += sells[bisect_left(sells, (prices['sell_price'], -1)):]
+        return [self.watches[watch_id] for _, watch_id in hits]
+
+    def watched_items(self) -> List[int]:
+        return list(set(self.buy_targets) | set(self.sell_targets))
+
+    def watches_for(self, item_id: int) -> List[PriceWatch]:
+        entries = self.buy_targets.get(item_id, []) + self.sell_targets.get(item_id, [])
+        return [self.watches[watch_id] for _, watch_id in entries]
+
+    async def run(self):
+        while self.watches:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check_items(self.watched_items())
+            except Exception as e:
+                print(f"❌ Error en el ciclo de alertas de precios: {e}")
+
+    async def check_items(self, item_ids: List[int], only: PriceWatch = None):
+        prices = await self.monitor.get_current_prices(item_ids)
+        for item_id, current_prices in prices.items():
+            watches = [only] if only else self.watches_for(item_id)
+            if not watches:
+                continue
+
+            # Historial una sola vez por ítem y ciclo (un monitoreo nuevo no agrega muestras);
+            # el gráfico sale del caché por tipo de precio
+            item_name = watches[0].item_name
+            if only:
+                history = await self.monitor.load_price_history(item_id, current_prices)
+            else:
+                history = await self.monitor.save_price_history(item_id, current_prices)
+
+            for watch in watches:
+                try:
+                    chart_bytes = await self.monitor.create_price_chart(item_id, item_name, history, watch.price_type)
+                    await self.update_watch(watch, current_prices, history, chart_bytes)
+                except Exception as e:
+                    self.remove(watch)
+                    await self.notify(watch, f"❌ Error durante el monitoreo: {str(e)}")
+
+            for watch in self.triggered(item_id, current_prices):
+                if only and watch is not only:
+                    continue
+                self.remove(watch)
+                alert_embed = discord.Embed(
+                    title="🎯 ¡Precio objetivo alcanzado!",
+                    description=f"El precio de **{watch.item_name}** ha llegado a tu objetivo ({watch.price_type.upper()})",
+                    color=discord.Color.green()
+                )
+                await self.notify(watch, embed=alert_embed)
+
+    @staticmethod
+    async def notify(watch: PriceWatch, *args, **kwargs):
+        """Envía un DM sin interrumpir el ciclo si falla (DMs cerrados, usuario no disponible)"""
+        try:
+            await watch.user.send(*args, **kwargs)
         except Exception as e:
-            await user.send(f"❌ Error durante el monitoreo: {str(e)}")
-            raise e
+            print(f"❌ No se pudo enviar el mensaje de monitoreo a {watch.user}: {e}")
+
+    async def update_watch(self, watch: PriceWatch, current_prices: dict, history: list, chart_bytes: bytes):
+        embed = await self.monitor.create_price_embed(
+            watch.item_details, current_prices, watch.target_price, history, watch.price_type
+        )
+        file = discord.File(io.BytesIO(chart_bytes), filename="price_trend.png")
+        embed.set_image(url="attachment://price_trend.png")
+        await watch.message.edit(content=None, embed=embed, attachments=[file], view=watch.view)
 
 class PriceAlert(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.price_monitor = GW2PriceMonitor(bot)
 
+    async def cog_load(self):
+        self.price_monitor.start_warmup()
+        # Los procesos de gráficos arrancan en un hilo: el primer render no espera al forkserver
+        try:
+            await asyncio.to_thread(self.price_monitor.charts.start)
+        except Exception as e:
+            print(f"❌ Error iniciando los procesos de gráficos: {e}")
+            self.price_monitor.charts.close()
+
+    def cog_unload(self):
+        self.price_monitor.close()
+
     @app_commands.command(
         name="monitor",
         description="Monitorea el precio de un ítem de GW2 hasta que alcance el precio objetivo"
@@ -374,13 +622,6 @@ class PriceAlert(commands.Cog):
         try:
             await interaction.response.defer(ephemeral=True, thinking=True)
             
-            if not self.price_monitor.initialized:
-                await interaction.followup.send(
-                    "🔄 Inicializando base de datos de items por primera vez...\n"
-                    "Esto puede tomar unos momentos...",
-                    ephemeral=True
-                )
-            
             target_price = parse_coins(precio)
             
             if target_price == 0:
@@ -391,6 +632,13 @@ class PriceAlert(commands.Cog):
                 return
             
             item_id, item_details = await self.price_monitor.get_item_id(item_name)
+            if not item_id and not self.price_monitor.initialized:
+                await interaction.followup.send(
+                    f"🔄 El catálogo de items todavía se está cargando y **{item_name}** no está entre los ítems conocidos.\n"
+                    "Inténtalo de nuevo en unos minutos.",
+                    ephemeral=True
+                )
+                return
             if not item_id:
                 await interaction.followup.send(
                     f"❌ No se encontró el ítem: {item_name}\n"
@@ -418,6 +666,13 @@ class PriceAlert(commands.Cog):
                 ephemeral=True
             )
 
+    @monitor.autocomplete('item_name')
+    async def item_name_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        return [
+            app_commands.Choice(name=name, value=value)
+            for name, value in self.price_monitor.prefix_index.search(current)
+        ]
+
 async def setup(bot):
     await bot.add_cog(PriceAlert(bot))
     try:
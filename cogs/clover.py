@@ -1,7 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import requests
+import asyncio
+from utils.gw2_client import GW2Client
 
 # Configuración de emojis
 EMOJIS = {
@@ -28,19 +29,20 @@ class CloverCalculator:
         return f"{gold}{EMOJIS['GOLD']} {silver}{EMOJIS['SILVER']} {copper_coins}{EMOJIS['COPPER']}"
 
     @staticmethod
-    async def fetch_price(item_id):
-        url = f"https://api.guildwars2.com/v2/commerce/prices/{item_id}"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
+    async def fetch_price(gw2: GW2Client, item_id):
+        price = await gw2.get_price(item_id)
+        if price:
+            return price
         else:
             raise ValueError("Error fetching price from GW2 API")
 
     @staticmethod
-    async def calculate_materials(num_clovers):
+    async def calculate_materials(gw2: GW2Client, num_clovers):
         try:
-            ecto_price = await CloverCalculator.fetch_price(ITEMS["ECTOPLASM"])
-            coin_price = await CloverCalculator.fetch_price(ITEMS["MYSTIC_COIN"])
+            ecto_price, coin_price = await asyncio.gather(
+                CloverCalculator.fetch_price(gw2, ITEMS["ECTOPLASM"]),
+                CloverCalculator.fetch_price(gw2, ITEMS["MYSTIC_COIN"])
+            )
 
             if "sells" not in ecto_price or "sells" not in coin_price:
                 raise ValueError("Incomplete price data")
@@ -101,6 +103,7 @@ class CloverCalculator:
 class CloverPrices(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        bot.gw2.market.track(ITEMS.values())
 
     @app_commands.command(name="clovers", description="Calculate materials needed for Mystic Clovers")
     @app_commands.describe(quantity="Number of Mystic Clovers to craft")
@@ -111,7 +114,7 @@ class CloverPrices(commands.Cog):
                 await interaction.followup.send("Quantity must be between 1 and 1000.", ephemeral=True)
                 return
 
-            materials = await CloverCalculator.calculate_materials(quantity)
+            materials = await CloverCalculator.calculate_materials(self.bot.gw2, quantity)
             embed = CloverCalculator.create_embed(quantity, materials)
             await interaction.followup.send(embed=embed)
 
@@ -2,8 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from datetime import datetime
-import aiohttp
-from typing import Dict, List, Optional
+from typing import Dict
 import sys
 import os
 
@@ -51,30 +50,18 @@ class Delivery(commands.Cog):
     
     async def get_delivery_details(self, api_key: str) -> Dict:
         """Obtiene los detalles de entrega del Trading Post"""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(
-                    'https://api.guildwars2.com/v2/commerce/delivery',
-                    headers={'Authorization': f'Bearer {api_key}'}
-                ) as response:
-                    if response.status == 401:
-                        raise Exception('Invalid API key')
-                    return await response.json()
-            except Exception as error:
-                print(f'Error fetching delivery details: {error}')
-                raise
-    
-    async def get_item_details(self, item_id: int) -> Dict:
-        """Obtiene los detalles de un item específico"""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(
-                    f'https://api.guildwars2.com/v2/items/{item_id}?lang=en'
-                ) as response:
-                    return await response.json()
-            except Exception as error:
-                print(f'Error fetching item {item_id}: {error}')
-                raise
+        session = self.bot.gw2.session
+        try:
+            async with session.get(
+                'https://api.guildwars2.com/v2/commerce/delivery',
+                headers={'Authorization': f'Bearer {api_key}'}
+            ) as response:
+                if response.status == 401:
+                    raise Exception('Invalid API key')
+                return await response.json()
+        except Exception as error:
+            print(f'Error fetching delivery details: {error}')
+            raise
     
     def get_rarity_emoji(self, rarity: str) -> str:
         """Retorna el emoji correspondiente a la rareza del item"""
@@ -126,17 +113,19 @@ class Delivery(commands.Cog):
         items_value = 'No items to collect'
         if details.get('items') and len(details['items']) > 0:
             try:
+                # Una sola resolución por lotes para todos los items de la entrega
+                items_details = await self.bot.gw2.items.get_many(item['id'] for item in details['items'])
                 items_with_names = []
                 for item in details['items']:
-                    try:
-                        item_details = await self.get_item_details(item['id'])
+                    item_details = items_details.get(item['id'])
+                    if item_details:
                         items_with_names.append({
                             'name': item_details['name'],
                             'count': item['count'],
                             'rarity': item_details['rarity'],
                             'icon': item_details['icon']
                         })
-                    except Exception:
+                    else:
                         items_with_names.append({
                             'name': f'Unknown Item ({item["id"]})',
                             'count': item['count'],
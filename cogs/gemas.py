@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import requests
+import asyncio
 
 class GW2Gemas(commands.Cog):
     def __init__(self, bot):
@@ -17,6 +17,11 @@ class GW2Gemas(commands.Cog):
         except Exception as e:
             print(f"Error al enviar respuesta: {e}")
 
+    async def fetch_json(self, url: str) -> dict:
+        """Consulta un endpoint de la API usando el pool de conexiones del bot"""
+        async with self.bot.gw2.session.get(url) as response:
+            return await response.json()
+
     @app_commands.command(name="gemas", description="Muestra las tasas de conversión de gemas")
     async def gemas(self, interaction: discord.Interaction, cantidad: int):
         """
@@ -37,9 +42,11 @@ class GW2Gemas(commands.Cog):
             # Para vender gemas consultamos cuánto oro nos dan por las gemas
             gems_to_coins_url = f"https://api.guildwars2.com/v2/commerce/exchange/gems?quantity={cantidad}"
 
-            # Hacemos las consultas
-            buy_response = requests.get(coins_to_gems_url).json()
-            sell_response = requests.get(gems_to_coins_url).json()
+            # Hacemos ambas consultas en paralelo
+            buy_response, sell_response = await asyncio.gather(
+                self.fetch_json(coins_to_gems_url),
+                self.fetch_json(gems_to_coins_url)
+            )
 
             # Procesamos el costo de comprar gemas
             coins_per_gem = buy_response.get('coins_per_gem', 0)
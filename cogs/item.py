@@ -2,9 +2,13 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import aiohttp
+import asyncio
 import math
 from typing import Dict, List, Set, Tuple, Optional
 import urllib
+from utils.name_index import PrefixIndex, normalize
+from utils.interactions import AutoDefer, LatencyEstimate
+from utils.orderbook import OrderBook, walk_total
 
 # Bidirectional mapping of item IDs and names
 ITEMS_MAP = {
@@ -108,7 +112,7 @@ ITEMS_MAP = {
     49433: {"mainName": "+10 Agony Infusion", "altNames": ["+10"]},
     49434: {"mainName": "+11 Agony Infusion", "altNames": ["+11"]},
     49438: {"mainName": "+15 Agony Infusion", "altNames": ["+15"]},
-    49438: {"mainName": "+16 Agony Infusion", "altNames": ["+16"]},
+    49439: {"mainName": "+16 Agony Infusion", "altNames": ["+16"]},
     44941: {"mainName": "Watchwork Sprocket", "altNames": ["Watchwork", "Engranaje"]},
     73248: {"mainName": "Stabilizing Matrix", "altNames": ["Matrix"]},
     72339: {"mainName": "Sello superior de concentración", "altNames": ["Vor", "Vortus"]},
@@ -224,6 +228,12 @@ ITEMS_MAP = {
 EXCLUDED_LEGENDARY_ITEMS = {96978, 96722, 103351}
 NINETY_FIVE_PERCENT_ITEMS = {85016, 84731, 83008}
 
+ECTO_ID = 19721
+MYSTIC_COIN_ID = 19976
+
+# Discord drops interactions not answered within 3 s; defer past this point
+ITEM_RESPONSE_BUDGET = 2.0
+
 # Rarity colors
 # Rarity colors
 RARITY_COLORS = {
@@ -237,9 +247,46 @@ RARITY_COLORS = {
     'Legendary': 0x4C139D  # Purple
 }
 
+def build_alias_index(items_map: dict) -> Tuple[Dict[str, int], Dict[str, List[int]]]:
+    """Normalized name -> item id, plus every name claimed by more than one item.
+
+    Main names are indexed before alternative names, so an alias never shadows
+    another item's main name; otherwise the first item in ITEMS_MAP wins.
+    """
+    index: Dict[str, int] = {}
+    collisions: Dict[str, List[int]] = {}
+    names = [(item["mainName"], id_) for id_, item in items_map.items()]
+    names += [(alt_name, id_) for id_, item in items_map.items() for alt_name in item.get("altNames", [])]
+    for name, id_ in names:
+        key = normalize(name)
+        current = index.setdefault(key, id_)
+        if current != id_:
+            ids = collisions.setdefault(key, [current])
+            if id_ not in ids:
+                ids.append(id_)
+    return index, collisions
+
+ITEM_ALIASES, ITEM_ALIAS_COLLISIONS = build_alias_index(ITEMS_MAP)
+for alias, ids in ITEM_ALIAS_COLLISIONS.items():
+    print(f"⚠️ Ambiguous item alias '{alias}' -> {', '.join(map(str, ids))} (using {ids[0]})")
+
+def item_name_entries(items_map: dict) -> List[Tuple[str, str]]:
+    """(display name, item id) pairs for every main and alternative name"""
+    entries = []
+    for id_, item in items_map.items():
+        entries.append((item["mainName"], str(id_)))
+        for alt_name in item.get("altNames", []):
+            entries.append((f"{alt_name} ({item['mainName']})", str(id_)))
+    return entries
+
+# Built once at import; autocomplete only bisects sorted arrays
+ITEM_NAME_INDEX = PrefixIndex(item_name_entries(ITEMS_MAP))
+
 class ItemPrice(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.latency = LatencyEstimate()
+        bot.gw2.market.track(list(ITEMS_MAP) + [ECTO_ID, MYSTIC_COIN_ID])
 
     def get_rarity_color(self, rarity: str) -> int:
         return RARITY_COLORS.get(rarity, 0x000000)
@@ -253,34 +300,20 @@ class ItemPrice(commands.Cog):
             print(f'Error getting the icon URL from the API: {error}')
             return None
 
-    async def get_precio_ecto(self, session: aiohttp.ClientSession) -> int:
-        try:
-            async with session.get('https://api.guildwars2.com/v2/commerce/prices/19721') as response:
-                ecto = await response.json()
-                return ecto['sells']['unit_price']
-        except Exception as error:
-            print(f'Error when getting the price of the ectos from the API: {error}')
+    def sell_price(self, price: Optional[dict]) -> Optional[int]:
+        if not price or "sells" not in price:
             return None
+        return price["sells"]["unit_price"]
 
-    async def get_precio_moneda_mistica(self, session: aiohttp.ClientSession) -> int:
+    async def get_order_book(self, objeto_id: int) -> Optional[OrderBook]:
         try:
-            async with session.get('https://api.guildwars2.com/v2/commerce/prices/19976') as response:
-                moneda_mistica = await response.json()
-                return moneda_mistica['sells']['unit_price']
+            return await self.bot.gw2.order_books.get(objeto_id)
         except Exception as error:
-            print(f'Error when getting the price of the Mystic Coins from the API: {error}')
+            print(f'Error getting the listings from the API: {error}')
             return None
 
     def find_object_id_by_name(self, name: str) -> int:
-        name_lower = name.lower()
-        for id_, item in ITEMS_MAP.items():
-            main_name = item["mainName"].lower()
-            if main_name == name_lower or (
-                "altNames" in item and 
-                any(alt_name.lower() == name_lower for alt_name in item["altNames"])
-            ):
-                return id_
-        return None
+        return ITEM_ALIASES.get(normalize(name))
 
     def calcular_monedas(self, precio: int) -> str:
         oro = precio // 10000
@@ -288,14 +321,15 @@ class ItemPrice(commands.Cog):
         cobre = precio % 100
         return f"{oro} <:gold:1328507096324374699> {plata} <:silver:1328507117748879422> {cobre} <:Copper:1328507127857418250>"
 
-    def format_sell_listings(self, listings: dict, max_entries: int = 5) -> str:
-        if not listings.get("sells"):
+    def format_sell_listings(self, book: Optional[OrderBook], max_entries: int = 5) -> str:
+        top_sells = book.top_sells(max_entries) if book else []
+        if not top_sells:
             return "No sell listings available"
         
         formatted_listings = []
-        for i, entry in enumerate(listings["sells"][:max_entries]):
-            price_str = self.calcular_monedas(entry["unit_price"])
-            formatted_listings.append(f"{i + 1}. {price_str} ({entry['quantity']}x)")
+        for i, (unit_price, listed_quantity) in enumerate(top_sells):
+            price_str = self.calcular_monedas(unit_price)
+            formatted_listings.append(f"{i + 1}. {price_str} ({listed_quantity}x)")
         
         return "\n".join(formatted_listings)
 
@@ -307,121 +341,146 @@ class ItemPrice(commands.Cog):
     async def item(self, interaction: discord.Interaction, item: str, quantity: int):
         objeto_id = int(item) if item.isdigit() else self.find_object_id_by_name(item)
 
+        async with AutoDefer(interaction, budget=ITEM_RESPONSE_BUDGET, estimate=self.latency) as responder:
+            await self.send_item_price(responder, objeto_id, quantity)
+
+    async def send_item_price(self, responder: AutoDefer, objeto_id: Optional[int], quantity: int):
         try:
             if not objeto_id or objeto_id not in ITEMS_MAP:
-                await interaction.response.send_message('The object with that ID or name was not found.')
+                await responder.send('The object with that ID or name was not found.')
                 return
 
-            async with aiohttp.ClientSession() as session:
-                # Get item price data
-                async with session.get(f"https://api.guildwars2.com/v2/commerce/prices/{objeto_id}") as response:
-                    objeto = await response.json()
+            # Item, ecto and MC prices in one ?ids= request; details come from the shared item repository
+            prices, objeto_details, book = await asyncio.gather(
+                self.bot.gw2.get_prices([objeto_id, ECTO_ID, MYSTIC_COIN_ID]),
+                self.bot.gw2.items.get(objeto_id),
+                self.get_order_book(objeto_id)
+            )
+            objeto = prices.get(objeto_id)
+
+            if not objeto or "sells" not in objeto or "buys" not in objeto:
+                await responder.send('The object does not have a valid selling price in the API.')
+                return
 
-                if not objeto or "sells" not in objeto or "buys" not in objeto:
-                    await interaction.response.send_message('The object does not have a valid selling price in the API.')
-                    return
+            if not objeto_details:
+                await responder.send('The object details could not be loaded from the API.')
+                return
 
+            # Walk the order book: large quantities climb past the best listing
+            available = None
+            if book:
+                buy_fill = book.buy_cost(quantity)
+                precio_venta = walk_total(buy_fill, quantity)
+                precio_compra = walk_total(book.sell_proceeds(quantity), quantity)
+                if buy_fill.filled < quantity:
+                    available = buy_fill.filled
+            else:
                 precio_venta = objeto["sells"]["unit_price"] * quantity
                 precio_compra = objeto["buys"]["unit_price"] * quantity
 
-                # Get item details
-                async with session.get(f"https://api.guildwars2.com/v2/items/{objeto_id}?lang=en") as response:
-                    objeto_details = await response.json()
-
-                nombre_objeto = objeto_details["name"]
-                rareza_objeto = objeto_details["rarity"]
-                imagen_objeto = objeto_details["icon"]
-
-                # Calculate discount
-                descuento = (0.95 if objeto_id in NINETY_FIVE_PERCENT_ITEMS else 
-                           0.85 if rareza_objeto == "Legendary" and objeto_id not in EXCLUDED_LEGENDARY_ITEMS else 
-                           0.90)
-                precio_descuento = math.floor(precio_venta * descuento)
-                precio_descuento_unidad = math.floor(objeto["sells"]["unit_price"] * descuento)
-
-                # Get ecto and MC prices
-                precio_ecto = await self.get_precio_ecto(session)
-                precio_moneda_mistica = await self.get_precio_moneda_mistica(session)
-
-                # Get listings
-                async with session.get(f"https://api.guildwars2.com/v2/commerce/listings/{objeto_id}") as response:
-                    listings = await response.json()
-
-                # Calculate ecto and MC equivalents
-                ectos_requeridos = None
-                num_stacks_ectos = None
-                ectos_adicionales = None
-                monedas_misticas_requeridas = None
-                num_stacks_monedas = None
-                monedas_adicionales = None
-
-                if precio_ecto:
-                    ectos_requeridos = math.ceil(precio_descuento / (precio_ecto * 0.9))
-                    num_stacks_ectos = ectos_requeridos // 250
-                    ectos_adicionales = ectos_requeridos % 250
-
-                if precio_moneda_mistica:
-                    monedas_misticas_requeridas = math.ceil(precio_descuento / (precio_moneda_mistica * 0.9))
-                    num_stacks_monedas = monedas_misticas_requeridas // 250
-                    monedas_adicionales = monedas_misticas_requeridas % 250
-
-                # Create embed
-                embed = discord.Embed(
-                    title=f"💰 Price of {nombre_objeto}",
-                    color=self.get_rarity_color(rareza_objeto)
-                )
-                embed.set_thumbnail(url=imagen_objeto)
-
-                # Add fields
+            nombre_objeto = objeto_details["name"]
+            rareza_objeto = objeto_details["rarity"]
+            imagen_objeto = objeto_details["icon"]
+
+            # Calculate discount
+            descuento = (0.95 if objeto_id in NINETY_FIVE_PERCENT_ITEMS else 
+                       0.85 if rareza_objeto == "Legendary" and objeto_id not in EXCLUDED_LEGENDARY_ITEMS else 
+                       0.90)
+            precio_descuento = math.floor(precio_venta * descuento)
+            precio_descuento_unidad = math.floor(objeto["sells"]["unit_price"] * descuento)
+
+            precio_ecto = self.sell_price(prices.get(ECTO_ID))
+            precio_moneda_mistica = self.sell_price(prices.get(MYSTIC_COIN_ID))
+
+            # Calculate ecto and MC equivalents
+            ectos_requeridos = None
+            num_stacks_ectos = None
+            ectos_adicionales = None
+            monedas_misticas_requeridas = None
+            num_stacks_monedas = None
+            monedas_adicionales = None
+
+            if precio_ecto:
+                ectos_requeridos = math.ceil(precio_descuento / (precio_ecto * 0.9))
+                num_stacks_ectos = ectos_requeridos // 250
+                ectos_adicionales = ectos_requeridos % 250
+
+            if precio_moneda_mistica:
+                monedas_misticas_requeridas = math.ceil(precio_descuento / (precio_moneda_mistica * 0.9))
+                num_stacks_monedas = monedas_misticas_requeridas // 250
+                monedas_adicionales = monedas_misticas_requeridas % 250
+
+            # Create embed
+            embed = discord.Embed(
+                title=f"💰 Price of {nombre_objeto}",
+                color=self.get_rarity_color(rareza_objeto)
+            )
+            embed.set_thumbnail(url=imagen_objeto)
+
+            # Add fields
+            embed.add_field(
+                name="<:TP:1328507535245836439> TP prices",
+                value=f"Sell: {self.calcular_monedas(precio_venta)}\nBuy: {self.calcular_monedas(precio_compra)}",
+                inline=False
+            )
+
+            embed.add_field(
+                name=f"💎 Price at {descuento * 100}%",
+                value=f"Per unit: {self.calcular_monedas(precio_descuento_unidad)}\n"
+                       f"**Total ({quantity}x): {self.calcular_monedas(precio_descuento)}**",
+                inline=False
+            )
+
+            embed.add_field(
+                name="<:TP2:1328507585153990707> Sell Listings",
+                value=self.format_sell_listings(book),
+                inline=False
+            )
+
+            if available is not None:
                 embed.add_field(
-                    name="<:TP:1328507535245836439> TP prices",
-                    value=f"Sell: {self.calcular_monedas(precio_venta)}\nBuy: {self.calcular_monedas(precio_compra)}",
+                    name="⚠️ Limited supply",
+                    value=f"Only {available} listed for sale; the remaining {quantity - available} are priced at the last listing.",
                     inline=False
                 )
 
+            if ectos_requeridos:
                 embed.add_field(
-                    name=f"💎 Price at {descuento * 100}%",
-                    value=f"Per unit: {self.calcular_monedas(precio_descuento_unidad)}\n"
-                           f"**Total ({quantity}x): {self.calcular_monedas(precio_descuento)}**",
-                    inline=False
+                    name="<:Ecto:1328507640635986041> Equivalent in Ectos",
+                    value=f"{num_stacks_ectos} stack{'s' if num_stacks_ectos != 1 else ''} and {ectos_adicionales} additional\n"
+                           f"Total: {ectos_requeridos} <:Ecto:1328507640635986041>",
+                    inline=True
                 )
 
+            if monedas_misticas_requeridas:
                 embed.add_field(
-                    name="<:TP2:1328507585153990707> Sell Listings",
-                    value=self.format_sell_listings(listings),
-                    inline=False
+                    name="<:mc:1328507835478315140> Equivalent in Mystic Coins",
+                    value=f"{num_stacks_monedas} stack{'s' if num_stacks_monedas != 1 else ''} and {monedas_adicionales} additional\n"
+                           f"Total: {monedas_misticas_requeridas} <:mc:1328507835478315140>",
+                    inline=True
                 )
 
-                if ectos_requeridos:
-                    embed.add_field(
-                        name="<:Ecto:1328507640635986041> Equivalent in Ectos",
-                        value=f"{num_stacks_ectos} stack{'s' if num_stacks_ectos != 1 else ''} and {ectos_adicionales} additional\n"
-                               f"Total: {ectos_requeridos} <:Ecto:1328507640635986041>",
-                        inline=True
-                    )
-
-                if monedas_misticas_requeridas:
-                    embed.add_field(
-                        name="<:mc:1328507835478315140> Equivalent in Mystic Coins",
-                        value=f"{num_stacks_monedas} stack{'s' if num_stacks_monedas != 1 else ''} and {monedas_adicionales} additional\n"
-                               f"Total: {monedas_misticas_requeridas} <:mc:1328507835478315140>",
-                        inline=True
-                    )
-
-                embed.add_field(
-                    name="🔗 Links",
-                    value=f"[GW2BLTC](https://www.gw2bltc.com/en/item/{objeto_id}) • "
-                          f"[Wiki](https://wiki.guildwars2.com/wiki/Special:Search/{urllib.parse.quote(nombre_objeto)})",
-                    inline=False
-                )
+            embed.add_field(
+                name="🔗 Links",
+                value=f"[GW2BLTC](https://www.gw2bltc.com/en/item/{objeto_id}) • "
+                      f"[Wiki](https://wiki.guildwars2.com/wiki/Special:Search/{urllib.parse.quote(nombre_objeto)})",
+                inline=False
+            )
 
-                embed.set_footer(text=f"ID: {objeto_id} • Rarity: {rareza_objeto}", icon_url=imagen_objeto)
+            embed.set_footer(text=f"ID: {objeto_id} • Rarity: {rareza_objeto}", icon_url=imagen_objeto)
 
-                await interaction.response.send_message(embed=embed)
+            await responder.send(embed=embed)
 
         except Exception as error:
             print(f'Error when making the API request: {error}')
-            await interaction.response.send_message('Oops! There was an error getting the price of the object from the API.')
+            await responder.send('Oops! There was an error getting the price of the object from the API.')
+
+    @item.autocomplete('item')
+    async def item_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        return [
+            app_commands.Choice(name=name, value=value)
+            for name, value in ITEM_NAME_INDEX.search(current)
+        ]
 
 async def setup(bot):
     await bot.add_cog(ItemPrice(bot))
\ No newline at end of file
@@ -5,6 +5,8 @@ import logging
 import aiohttp
 import asyncio
 from typing import Optional, List, Dict, Any
+from utils.gw2_client import GW2Client
+from utils.orderbook import OrderBook, walk_total
 
 # Configuración de emojis
 EMOJIS = {
@@ -44,49 +46,61 @@ class MaterialPriceCalculator:
         return f"{gold}{EMOJIS['GOLD']} {silver}{EMOJIS['SILVER']} {copper_coins}{EMOJIS['COPPER']}"
 
     @staticmethod
-    async def fetch_material_prices(materials: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for material in materials:
-                url = f"https://api.guildwars2.com/v2/commerce/prices/{material['itemId']}"
-                task = MaterialPriceCalculator.fetch_price_for_material(session, material, url)
-                tasks.append(task)
-
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            valid_results = []
+    async def fetch_material_prices(gw2: GW2Client,
+                                    materials: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        tasks = []
+        for material in materials:
+            task = MaterialPriceCalculator.fetch_price_for_material(gw2, material)
+            tasks.append(task)
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        valid_results = []
+        
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error(f"Error fetching price: {result}")
+                continue
+            if result is not None:
+                valid_results.append(result)
+        
+        if not valid_results:
+            raise ValueError("No valid price data could be retrieved")
             
-            for result in results:
-                if isinstance(result, Exception):
-                    logging.error(f"Error fetching price: {result}")
-                    continue
-                if result is not None:
-                    valid_results.append(result)
-            
-            if not valid_results:
-                raise ValueError("No valid price data could be retrieved")
-                
-            return valid_results
+        return valid_results
 
     @staticmethod
-    async def fetch_price_for_material(session: aiohttp.ClientSession, 
-                                     material: Dict[str, Any], 
-                                     url: str) -> Optional[Dict[str, Any]]:
+    async def fetch_order_book(gw2: GW2Client, material: Dict[str, Any]) -> Optional[OrderBook]:
+        # Sin libro de órdenes se usa el mejor precio × cantidad
         try:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    logging.error(f"API returned status {response.status} for {material['name']}")
-                    return None
-                    
-                data = await response.json()
-                if "sells" not in data or "unit_price" not in data["sells"]:
-                    logging.error(f"Invalid price data format for {material['name']}")
-                    return None
-
-                return {
-                    **material,
-                    "unitPrice": data["sells"]["unit_price"],
-                    "totalPrice": data["sells"]["unit_price"] * material["stackSize"]
-                }
+            return await gw2.order_books.get(material['itemId'])
+        except Exception as e:
+            logging.error(f"Error fetching listings for {material['name']}: {e}")
+            return None
+
+    @staticmethod
+    async def fetch_price_for_material(gw2: GW2Client, 
+                                     material: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            data, book = await asyncio.gather(
+                gw2.get_price(material['itemId']),
+                MaterialPriceCalculator.fetch_order_book(gw2, material)
+            )
+            if data is None:
+                logging.error(f"API returned no price for {material['name']}")
+                return None
+
+            if "sells" not in data or "unit_price" not in data["sells"]:
+                logging.error(f"Invalid price data format for {material['name']}")
+                return None
+
+            # El total recorre el libro de órdenes en lugar de multiplicar el mejor precio
+            total_price = (walk_total(book.buy_cost(material["stackSize"]), material["stackSize"]) if book
+                           else data["sells"]["unit_price"] * material["stackSize"])
+            return {
+                **material,
+                "unitPrice": data["sells"]["unit_price"],
+                "totalPrice": total_price
+            }
         except aiohttp.ClientError as e:
             logging.error(f"Network error fetching {material['name']}: {e}")
             return None
@@ -144,6 +158,7 @@ class MaterialPriceCalculator:
 class MagicCommand(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        bot.gw2.market.track(material["itemId"] for material in MATERIALS)
         logging.basicConfig(level=logging.ERROR)
 
     @app_commands.command(
@@ -154,7 +169,7 @@ class MagicCommand(commands.Cog):
         try:
             await interaction.response.defer()
 
-            price_data = await MaterialPriceCalculator.fetch_material_prices(MATERIALS)
+            price_data = await MaterialPriceCalculator.fetch_material_prices(self.bot.gw2, MATERIALS)
             if not price_data:
                 await interaction.followup.send(
                     content="Could not retrieve any material prices from the Trading Post. Please try again later."
@@ -1,7 +1,6 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiohttp
 import re
 
 class RecipeCommand(commands.Cog):
@@ -35,71 +34,71 @@ class RecipeCommand(commands.Cog):
         if item_name in self.cache:
             return self.cache[item_name]
 
-        async with aiohttp.ClientSession() as session:
-            # Buscar la página del ítem
-            params = {
-                "action": "query",
-                "list": "search",
-                "srsearch": item_name,
-                "format": "json",
-                "srlimit": 1
-            }
+        session = self.bot.gw2.session
+        # Buscar la página del ítem
+        params = {
+            "action": "query",
+            "list": "search",
+            "srsearch": item_name,
+            "format": "json",
+            "srlimit": 1
+        }
+        
+        async with session.get(self.WIKI_API_EN, params=params) as response:
+            data = await response.json()
+            if not data.get("query", {}).get("search"):
+                return (item_name, 1, None, [])
             
-            async with session.get(self.WIKI_API_EN, params=params) as response:
-                data = await response.json()
-                if not data.get("query", {}).get("search"):
-                    return (item_name, 1, None, [])
-                
-                page_title = data["query"]["search"][0]["title"]
+            page_title = data["query"]["search"][0]["title"]
 
-            # Obtener el contenido de la página
-            params = {
-                "action": "query",
-                "prop": "revisions|images",
-                "titles": page_title,
-                "rvprop": "content",
-                "format": "json"
-            }
-            
-            ingredients = []
-            icon_url = None
+        # Obtener el contenido de la página
+        params = {
+            "action": "query",
+            "prop": "revisions|images",
+            "titles": page_title,
+            "rvprop": "content",
+            "format": "json"
+        }
+        
+        ingredients = []
+        icon_url = None
+        
+        async with session.get(self.WIKI_API_EN, params=params) as response:
+            data = await response.json()
+            pages = data["query"]["pages"]
+            page = next(iter(pages.values()))
+            content = page["revisions"][0]["*"]
             
-            async with session.get(self.WIKI_API_EN, params=params) as response:
-                data = await response.json()
-                pages = data["query"]["pages"]
-                page = next(iter(pages.values()))
-                content = page["revisions"][0]["*"]
-                
-                # Buscar el ícono del ítem
-                if "images" in page:
-                    for image in page["images"]:
-                        if "icon" in image["title"].lower():
-                            icon_url = await self.get_file_url(session, image["title"].replace("File:", ""))
-                            break
+            # Buscar el ícono del ítem
+            if "images" in page:
+                for image in page["images"]:
+                    if "icon" in image["title"].lower():
+                        icon_url = await self.get_file_url(session, image["title"].replace("File:", ""))
+                        break
 
-                # Extraer información de la receta
-                recipe_start = content.find("{{Recipe")
-                if recipe_start != -1:
-                    recipe_end = content.find("}}", recipe_start)
-                    recipe = content[recipe_start:recipe_end]
-                    
-                    # Extraer ingredientes con cantidades
-                    for line in recipe.split("\n"):
-                        if "ingredient" in line.lower() and "|" in line:
-                            parts = line.split("|")
-                            quantity = 1
-                            ing_name = parts[-1].strip()
-                            
-                            # Buscar cantidad
-                            for part in parts:
-                                if part.strip().isdigit():
-                                    quantity = int(part.strip())
-                                    break
-                                    
-                            if ing_name and not ing_name.startswith("}}"):
-                                # Recursivamente obtener información del ingrediente
-                                ing_info = await self.get_recipe_info(ing_name, level + 1)
-                                ingredients.append((quantity, ing_info))
+            # Extraer información de la receta
+            recipe_start = content.find("{{Recipe")
+            if recipe_start != -1:
+                recipe_end = content.find("}}", recipe_start)
+                recipe = content[recipe_start:recipe_end]
+                
+                # Extraer ingredientes con cantidades
+                for line in recipe.split("\n"):
+                    if "ingredient" in line.lower() and "|" in line:
+                        parts = line.split("|")
+                        quantity = 1
+                        ing_name = parts[-1].strip()
+                        
+                        # Buscar cantidad
+                        for part in parts:
+                            if part.strip().isdigit():
+                                quantity = int(part.strip())
+                                break
+                                
+                        if ing_name and not ing_name.startswith("}}"):
+                            # Recursivamente obtener información del ingrediente
+                            ing_info = await self.get_recipe_info(ing_name, level + 1)
+                            ingredients.append((quantity, ing_info))
 
         result = (page_title, 1, icon_url, ingredients)
         self.cache[item_name] = result
@@ -1,6 +1,9 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
+import asyncio
 import datetime
+import heapq
+import itertools
 import re
 from typing import Optional, Tuple
 from utils.database import dbManager
@@ -35,29 +38,53 @@ class Reminders(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.reminders = []
-        self.check_reminders.start()
+        # Recordatorios activos por id; el heap guarda (hora, id) y las entradas
+        # cuyo id ya no está en este dict (cancelados) se descartan al llegar al tope
+        self.reminders = {}
+        self.heap = []
+        self.ids = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.scheduler_task = None
         print("✅ Inicializado Reminders Cog")
 
     async def cog_load(self):
         """Este método se llama cuando el cog es cargado"""
         print("🔄 Cargando recordatorios...")
         await self.load_reminders()
+        self.scheduler_task = asyncio.create_task(self.run_scheduler())
         print("✅ Recordatorios cargados")
 
     def cog_unload(self):
         """Este método se llama cuando el cog es descargado"""
         print("🔄 Descargando Reminders Cog")
-        self.check_reminders.cancel()
+        if self.scheduler_task:
+            self.scheduler_task.cancel()
+
+    def schedule(self, reminder):
+        """Agrega un recordatorio al heap en O(log n) y despierta al scheduler si es el más próximo"""
+        reminder_id = next(self.ids)
+        reminder['id'] = reminder_id
+        self.reminders[reminder_id] = reminder
+        heapq.heappush(self.heap, (reminder['time'], reminder_id))
+        if self.heap[0][1] == reminder_id:
+            self.wakeup.set()
+
+    def unschedule(self, reminder):
+        """Cancela un recordatorio; su entrada del heap se descarta de forma perezosa"""
+        self.reminders.pop(reminder.get('id'), None)
+
+    def user_reminders(self, user_id):
+        return [r for r in self.reminders.values() if r['user_id'] == user_id]
 
     async def load_reminders(self):
         try:
             reminders_data = await dbManager.get_all_reminders()
-            self.reminders = []
+            self.reminders = {}
+            self.heap = []
             
             for reminder_data in reminders_data:
                 try:
-                    self.reminders.append({
+                    self.schedule({
                         'user_id': int(reminder_data['user_id']),
                         'channel_id': int(reminder_data['channel_id']),
                         'target_id': int(reminder_data.get('target_id')) if reminder_data.get('target_id') else None,
@@ -72,7 +99,8 @@ class Reminders(commands.Cog):
             print(f"✅ Cargados {len(self.reminders)} recordatorios exitosamente")
         except Exception as e:
             print(f"❌ Error cargando recordatorios de Firebase: {e}")
-            self.reminders = []
+            self.reminders = {}
+            self.heap = []
 
     async def save_reminder(self, reminder):
         try:
@@ -97,44 +125,64 @@ class Reminders(commands.Cog):
             print(f"❌ Error eliminando recordatorio de Firebase: {e}")
             return False
 
-    @tasks.loop(seconds=30)
-    async def check_reminders(self):
-        now = datetime.datetime.now()
-        reminders_to_remove = []
-
-        for reminder in self.reminders:
-            if reminder['time'] <= now:
-                user = self.bot.get_user(reminder['user_id'])
-                if user:
-                    embed = discord.Embed(
-                        title="Reminder",
-                        color=discord.Color.blue(),
-                    )
-                    embed.add_field(
-                        name="Message",
-                        value=reminder['message'],
-                        inline=False
-                    )
-                    embed.add_field(
-                        name="Created at",
-                        value=reminder['time'].strftime('%Y-%m-%d %H:%M:%S'),
-                        inline=False
-                    )
-                    embed.add_field(
-                        name="By",
-                        value=f"<@{reminder['user_id']}>",
-                        inline=False
-                    )
-                    try:
-                        await user.send(embed=embed)
-                    except discord.HTTPException:
-                        pass
-                reminders_to_remove.append(reminder)
-
-        for reminder in reminders_to_remove:
-            self.reminders.remove(reminder)
+    async def run_scheduler(self):
+        """Duerme hasta el recordatorio más próximo, o hasta que se agregue uno anterior"""
+        await self.bot.wait_until_ready()
+        while True:
+            self.wakeup.clear()
+            while self.heap and self.heap[0][1] not in self.reminders:
+                heapq.heappop(self.heap)
+
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+
+            due_time, reminder_id = self.heap[0]
+            delay = (due_time - datetime.datetime.now()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self.heap)
+            reminder = self.reminders.pop(reminder_id, None)
+            if reminder is None:
+                continue
+            try:
+                await self.send_reminder(reminder)
+            except Exception as e:
+                print(f"❌ Error enviando recordatorio: {e}")
             await self.delete_reminder(reminder)
 
+    async def send_reminder(self, reminder):
+        user = self.bot.get_user(reminder['user_id'])
+        if user:
+            embed = discord.Embed(
+                title="Reminder",
+                color=discord.Color.blue(),
+            )
+            embed.add_field(
+                name="Message",
+                value=reminder['message'],
+                inline=False
+            )
+            embed.add_field(
+                name="Created at",
+                value=reminder['time'].strftime('%Y-%m-%d %H:%M:%S'),
+                inline=False
+            )
+            embed.add_field(
+                name="By",
+                value=f"<@{reminder['user_id']}>",
+                inline=False
+            )
+            try:
+                await user.send(embed=embed)
+            except discord.HTTPException:
+                pass
+
     @commands.group(name='reminder', aliases=['remind'], invoke_without_command=True)
     async def reminder(self, ctx, *, content: str):
         """Comando para establecer un recordatorio"""
@@ -151,7 +199,7 @@ class Reminders(commands.Cog):
                 'original_message': f"Establecido el {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             }
 
-            self.reminders.append(reminder)
+            self.schedule(reminder)
             success = await self.save_reminder(reminder)
 
             if success:
@@ -178,7 +226,7 @@ class Reminders(commands.Cog):
     @commands.command(name='reminders', aliases=['listreminders', 'myreminders'])
     async def list_reminders(self, ctx):
         """Muestra todos tus recordatorios activos"""
-        user_reminders = [r for r in self.reminders if r['user_id'] == ctx.author.id]
+        user_reminders = self.user_reminders(ctx.author.id)
         
         if not user_reminders:
             await ctx.send("No tienes recordatorios activos.")
@@ -213,14 +261,14 @@ class Reminders(commands.Cog):
     @commands.command(name='removereminder', aliases=['remove', 'delreminder'])
     async def remove_reminder(self, ctx, index: int):
         """Elimina un recordatorio específico por su número"""
-        user_reminders = [r for r in self.reminders if r['user_id'] == ctx.author.id]
+        user_reminders = self.user_reminders(ctx.author.id)
         
         if not user_reminders or index > len(user_reminders) or index < 1:
             await ctx.send("❌ Índice de recordatorio inválido.")
             return
 
         reminder_to_remove = user_reminders[index - 1]
-        self.reminders.remove(reminder_to_remove)
+        self.unschedule(reminder_to_remove)
         success = await self.delete_reminder(reminder_to_remove)
         
         if success:
@@ -231,7 +279,7 @@ class Reminders(commands.Cog):
     @commands.command(name='removeall', aliases=['clearreminders'])
     async def remove_all_reminders(self, ctx):
         """Elimina todos tus recordatorios activos"""
-        user_reminders = [r for r in self.reminders if r['user_id'] == ctx.author.id]
+        user_reminders = self.user_reminders(ctx.author.id)
 
         if not user_reminders:
             await ctx.send("No tienes recordatorios activos para eliminar.")
@@ -239,7 +287,7 @@ class Reminders(commands.Cog):
 
         success = True
         for reminder in user_reminders:
-            self.reminders.remove(reminder)
+            self.unschedule(reminder)
             if not await self.delete_reminder(reminder):
                 success = False
 
@@ -1,15 +1,26 @@
-from discord.ext import commands, tasks
-from datetime import datetime
+from discord.ext import commands
+from datetime import datetime, timedelta
+import asyncio
+import heapq
 import pytz
 import discord
 from utils.database import dbManager
 
 class Reminder(commands.Cog):
+    # Si el bot estuvo caído durante un envío, se recupera si no pasó más de este tiempo
+    CATCH_UP_WINDOW = timedelta(hours=24)
+
     def __init__(self, client):
         self.client = client
         self.db = dbManager
         self.tz_col = pytz.timezone('America/Bogota')
-        self.reminder.start()
+        # Configuración y próximo envío por servidor; el heap guarda (hora, guild_id)
+        # y las entradas que ya no coinciden con next_fire se descartan al salir
+        self.configs = {}
+        self.next_fire = {}
+        self.heap = []
+        self.wakeup = asyncio.Event()
+        self.scheduler_task = None
         self.dias = {
             "lunes": 0,
             "martes": 1,
@@ -20,14 +31,97 @@ class Reminder(commands.Cog):
             "domingo": 6
         }
 
+    async def cog_load(self):
+        self.scheduler_task = asyncio.create_task(self.run_scheduler())
+
     def cog_unload(self):
-        self.reminder.cancel()
+        if self.scheduler_task:
+            self.scheduler_task.cancel()
+
+    def next_occurrence(self, reminder_config, after: datetime) -> datetime:
+        """Próxima hora de envío (estrictamente posterior a `after`) en la zona horaria configurada"""
+        local = after.astimezone(self.tz_col)
+        days_ahead = (reminder_config.get('day', 0) - local.weekday()) % 7
+        for weeks in range(3):
+            date = local.date() + timedelta(days=days_ahead + 7 * weeks)
+            candidate = self.tz_col.localize(datetime(
+                date.year, date.month, date.day,
+                reminder_config.get('hour', 2), reminder_config.get('minute', 0)
+            ))
+            if candidate > after:
+                return candidate
+
+    def update_guild(self, guild_id, reminder_config):
+        """Recalcula el próximo envío de un servidor y despierta al scheduler"""
+        now = datetime.now(pytz.utc)
+        fire_time = self.next_occurrence(reminder_config, now)
+        self.configs[guild_id] = reminder_config
+        self.next_fire[guild_id] = fire_time
+        heapq.heappush(self.heap, (fire_time, guild_id))
+        self.wakeup.set()
+
+    async def load_configs(self):
+        """Carga una vez las configuraciones de los servidores y envía los avisos perdidos"""
+        reminders = await self.db.get_all_reminders()
+        now = datetime.now(pytz.utc)
+
+        for reminder in reminders:
+            # La colección también guarda los recordatorios personales de cogs/remind.py
+            if 'guild_id' not in reminder:
+                continue
+            reminder.pop('userId', None)
+            guild_id = str(reminder['guild_id'])
+            self.update_guild(guild_id, reminder)
+
+            last_sent = reminder.get('last_sent')
+            if last_sent:
+                previous_fire = self.next_fire[guild_id] - timedelta(days=7)
+                if datetime.fromisoformat(last_sent) < previous_fire and now - previous_fire <= self.CATCH_UP_WINDOW:
+                    print(f"⏰ Enviando recordatorio semanal perdido para {guild_id}")
+                    await self.send_announcement(guild_id)
+
+    async def run_scheduler(self):
+        """Duerme hasta el próximo envío de cualquier servidor"""
+        await self.client.wait_until_ready()
+        await self.load_configs()
+        while True:
+            self.wakeup.clear()
+            while self.heap and self.next_fire.get(self.heap[0][1]) != self.heap[0][0]:
+                heapq.heappop(self.heap)
+
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+
+            fire_time, guild_id = self.heap[0]
+            delay = (fire_time - datetime.now(pytz.utc)).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
 
-    def is_reminder_time(self, reminder_config):
-        now = datetime.now(self.tz_col)
-        return (now.weekday() == reminder_config.get('day', 0) and 
-                now.hour == reminder_config.get('hour', 2) and 
-                now.minute == reminder_config.get('minute', 0))
+            heapq.heappop(self.heap)
+            try:
+                await self.send_announcement(guild_id)
+            except Exception as e:
+                print(f"❌ Error enviando recordatorio semanal para {guild_id}: {e}")
+            self.update_guild(guild_id, self.configs[guild_id])
+
+    async def send_announcement(self, guild_id):
+        reminder = self.configs[guild_id]
+        channel_id = reminder.get('channel_id')
+        role_id = reminder.get('role_id')
+        message = reminder.get('message', "Hoy se reinicia la semana. ¡Recuerda comprar tus ASS!")
+        
+        if channel_id:
+            channel = self.client.get_channel(channel_id)
+            if channel:
+                role_mention = f"<@&{role_id}>" if role_id else ""
+                await channel.send(f"{message} {role_mention}")
+                reminder['last_sent'] = datetime.now(pytz.utc).isoformat()
+                await self.db.setReminder(guild_id, reminder)
 
     @commands.has_permissions(administrator=True)
     @commands.command(name="setcanal")
@@ -40,6 +134,7 @@ class Reminder(commands.Cog):
 
         success = await self.db.setReminder(guild_id, reminder_data)
         if success:
+            self.update_guild(guild_id, reminder_data)
             await ctx.send(f"✅ Canal de recordatorios establecido a {channel.mention}")
         else:
             await ctx.send("❌ Hubo un error al configurar el canal")
@@ -55,6 +150,7 @@ class Reminder(commands.Cog):
 
         success = await self.db.setReminder(guild_id, reminder_data)
         if success:
+            self.update_guild(guild_id, reminder_data)
             await ctx.send(f"✅ Rol para mencionar establecido a {role.mention}")
         else:
             await ctx.send("❌ Hubo un error al configurar el rol")
@@ -76,6 +172,7 @@ class Reminder(commands.Cog):
 
         success = await self.db.setReminder(guild_id, reminder_data)
         if success:
+            self.update_guild(guild_id, reminder_data)
             await ctx.send(f"✅ Día del recordatorio establecido a {dia}")
         else:
             await ctx.send("❌ Hubo un error al configurar el día")
@@ -96,6 +193,7 @@ class Reminder(commands.Cog):
 
         success = await self.db.setReminder(guild_id, reminder_data)
         if success:
+            self.update_guild(guild_id, reminder_data)
             await ctx.send(f"✅ Hora del recordatorio establecida a {hora:02d}:{minuto:02d}")
         else:
             await ctx.send("❌ Hubo un error al configurar la hora")
@@ -111,6 +209,7 @@ class Reminder(commands.Cog):
 
         success = await self.db.setReminder(guild_id, reminder_data)
         if success:
+            self.update_guild(guild_id, reminder_data)
             await ctx.send(f"✅ Mensaje del recordatorio establecido a: {mensaje}")
         else:
             await ctx.send("❌ Hubo un error al configurar el mensaje")
@@ -198,25 +297,5 @@ class Reminder(commands.Cog):
             }
         return reminder_data
 
-    @tasks.loop(minutes=1)
-    async def reminder(self):
-        reminders = await self.db.get_all_reminders()
-        
-        for reminder in reminders:
-            if self.is_reminder_time(reminder):
-                channel_id = reminder.get('channel_id')
-                role_id = reminder.get('role_id')
-                message = reminder.get('message', "Hoy se reinicia la semana. ¡Recuerda comprar tus ASS!")
-                
-                if channel_id:
-                    channel = self.client.get_channel(channel_id)
-                    if channel:
-                        role_mention = f"<@&{role_id}>" if role_id else ""
-                        await channel.send(f"{message} {role_mention}")
-
-    @reminder.before_loop
-    async def before_reminder(self):
-        await self.client.wait_until_ready()
-
 async def setup(client):
     await client.add_cog(Reminder(client))
\ No newline at end of file
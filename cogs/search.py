@@ -1,16 +1,98 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import requests
+import aiohttp
+import asyncio
+import os
+import time
 from datetime import datetime
-from typing import Optional
-from collections import defaultdict
+from typing import Dict, List, Optional, Set
+from collections import OrderedDict, defaultdict
 from utils.database import dbManager
+from utils.name_index import normalize
+
+class BankIndex:
+    """Banco agrupado por objeto con un índice invertido de trigramas sobre los nombres.
+
+    Los grupos (cantidad total y slots) no dependen de la búsqueda, así que se calculan
+    una vez por snapshot. Se indexan los nombres en inglés y en español; cada búsqueda
+    intersecta los trigramas de la consulta y solo confirma la subcadena en esos candidatos.
+    """
+
+    def __init__(self, bank_data: list, items_data: Dict[int, dict],
+                 localized_data: Optional[Dict[int, Optional[dict]]] = None):
+        self.bank_data = bank_data
+        localized_data = localized_data or {}
+        grouped_items = defaultdict(lambda: {
+            'total_quantity': 0,
+            'slots': [],
+            'details': None
+        })
+        names: Dict[str, Set[str]] = defaultdict(set)
+
+        for slot_index, item in enumerate(bank_data):
+            if item is None:
+                continue
+
+            item_details = items_data.get(item['id'])
+            if item_details:
+                key = f"{item_details['name']}_{item_details.get('rarity', 'Desconocido')}"
+                grouped_items[key]['total_quantity'] += item['count']
+                grouped_items[key]['slots'].append(slot_index + 1)
+                if not grouped_items[key]['details']:
+                    grouped_items[key]['details'] = {
+                        'name': item_details['name'],
+                        'rarity': item_details.get('rarity', 'Desconocido'),
+                        'icon': item_details.get('icon', '')
+                    }
+                names[key].add(normalize(item_details['name']))
+                localized = localized_data.get(item['id'])
+                if localized:
+                    names[key].add(normalize(localized['name']))
+        self.groups = dict(grouped_items)
+
+        # Posición del grupo (orden del banco) -> nombres normalizados; trigrama -> posiciones
+        self.keys = list(self.groups)
+        self.names = [tuple(names[key]) for key in self.keys]
+        postings: Dict[str, Set[int]] = defaultdict(set)
+        for position, group_names in enumerate(self.names):
+            for name in group_names:
+                for gram in self.trigrams(name):
+                    postings[gram].add(position)
+        self.postings = dict(postings)
+
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def search(self, material: str) -> List[dict]:
+        """Grupos cuyo nombre contiene `material` (sin distinguir mayúsculas ni acentos), en orden del banco"""
+        query = normalize(material)
+        grams = self.trigrams(query)
+        if grams:
+            # Toda subcadena de 3+ caracteres contiene todos sus trigramas
+            postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+            positions = sorted(set.intersection(*postings))
+        else:
+            # Consultas de menos de 3 caracteres: el banco es chico, se revisa completo
+            positions = range(len(self.keys))
+        return [self.groups[self.keys[position]] for position in positions
+                if any(query in name for name in self.names[position])]
+
+class BankSnapshot:
+    def __init__(self, api_key: str, index: BankIndex):
+        self.api_key = api_key
+        self.index = index
+        self.fetched_at = time.monotonic()
 
 class BankSearch(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.db_ready = False
+        # Snapshot del banco por usuario (LRU) para no descargarlo en cada búsqueda
+        self.snapshots: "OrderedDict[str, BankSnapshot]" = OrderedDict()
+        self.snapshot_ttl = float(os.getenv('BANK_CACHE_TTL', 120))
+        self.max_snapshots = 256
         
         self.bank_group = app_commands.Group(name="bank", description="Busca objetos en tu banco de GW2")
         
@@ -51,6 +133,53 @@ class BankSearch(commands.Cog):
             
             return f"Encontrado en {len(bags)} sacos: {', '.join(bag_info)}"
 
+    async def fetch_bank(self, api_key: str) -> list:
+        session = self.bot.gw2.session
+        async with session.get(
+            'https://api.guildwars2.com/v2/account/bank',
+            headers={'Authorization': f'Bearer {api_key}'},
+            raise_for_status=True
+        ) as bank_response:
+            return await bank_response.json()
+
+    async def fetch_items_data(self, bank_items: list, lang: str = 'en') -> Dict[int, Optional[dict]]:
+        # Repositorio compartido: ids sin repetir, lo conocido desde memoria y el resto
+        # en chunks de hasta 200 ids pedidos en paralelo (la API rechaza listas más largas)
+        return await self.bot.gw2.items.get_many((item['id'] for item in bank_items), lang)
+
+    async def get_bank_index(self, user_id: str, api_key: str) -> BankIndex:
+        """Índice del banco del usuario; solo se reconstruye si el banco cambió"""
+        snapshot = self.snapshots.get(user_id)
+        if snapshot is not None and snapshot.api_key == api_key:
+            self.snapshots.move_to_end(user_id)
+            if time.monotonic() - snapshot.fetched_at < self.snapshot_ttl:
+                return snapshot.index
+
+        bank_data = await self.fetch_bank(api_key)
+        if snapshot is not None and snapshot.api_key == api_key and snapshot.index.bank_data == bank_data:
+            # Mismo contenido: se reutiliza el índice y solo se renueva el TTL
+            snapshot.fetched_at = time.monotonic()
+            return snapshot.index
+
+        bank_items = [item for item in bank_data if item]
+        items_data, localized_data = await asyncio.gather(
+            self.fetch_items_data(bank_items),
+            self.fetch_items_data(bank_items, 'es')
+        ) if bank_items else ({}, {})
+        index = BankIndex(bank_data, items_data, localized_data)
+        repository = self.bot.gw2.items
+        if any(item is None and not repository.is_missing(item_id, lang)
+               for lang, data in (('en', items_data), ('es', localized_data))
+               for item_id, item in data.items()):
+            # Faltan metadatos por un error de red: se responde con lo que hay pero no se cachea.
+            # Los ids que la API no conoce no cuentan como error.
+            return index
+        self.snapshots[user_id] = BankSnapshot(api_key, index)
+        self.snapshots.move_to_end(user_id)
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+        return index
+
     async def search_material(self, interaction: discord.Interaction, material: str):
         # Cambiado a False para que el resultado sea visible para todos
         await interaction.response.defer(ephemeral=False)
@@ -69,18 +198,9 @@ class BankSearch(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
 
-            headers = {
-                'Authorization': f'Bearer {api_key}'
-            }
-            
-            bank_response = requests.get(
-                'https://api.guildwars2.com/v2/account/bank',
-                headers=headers
-            )
-            bank_response.raise_for_status()
-            bank_items = [item for item in bank_response.json() if item]
+            bank_index = await self.get_bank_index(user_id, api_key)
 
-            if not bank_items:
+            if not any(bank_index.bank_data):
                 embed = discord.Embed(
                     title="📦 Resultados de búsqueda",
                     description=f"¡El banco de {interaction.user.display_name} está vacío!",
@@ -90,34 +210,7 @@ class BankSearch(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
 
-            item_ids = ','.join(str(item['id']) for item in bank_items)
-            items_response = requests.get(
-                f'https://api.guildwars2.com/v2/items?ids={item_ids}'
-            )
-            items_response.raise_for_status()
-            items_data = {item['id']: item for item in items_response.json()}
-
-            grouped_items = defaultdict(lambda: {
-                'total_quantity': 0,
-                'slots': [],
-                'details': None
-            })
-
-            for slot_index, item in enumerate(bank_response.json()):
-                if item is None:
-                    continue
-                
-                item_details = items_data.get(item['id'])
-                if item_details and material.lower() in item_details['name'].lower():
-                    key = f"{item_details['name']}_{item_details.get('rarity', 'Desconocido')}"
-                    grouped_items[key]['total_quantity'] += item['count']
-                    grouped_items[key]['slots'].append(slot_index + 1)
-                    if not grouped_items[key]['details']:
-                        grouped_items[key]['details'] = {
-                            'name': item_details['name'],
-                            'rarity': item_details.get('rarity', 'Desconocido'),
-                            'icon': item_details.get('icon', '')
-                        }
+            grouped_items = bank_index.search(material)
 
             if grouped_items:
                 embed = discord.Embed(
@@ -128,7 +221,7 @@ class BankSearch(commands.Cog):
                 )
                 
                 first_item = True
-                for item_data in grouped_items.values():
+                for item_data in grouped_items:
                     details = item_data['details']
                     slot_info = self.format_slot_info(item_data['slots'])
                     
@@ -151,8 +244,8 @@ class BankSearch(commands.Cog):
 
             await interaction.followup.send(embed=embed)
 
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
+        except aiohttp.ClientResponseError as e:
+            if e.status == 401:
                 embed = discord.Embed(
                     title="❌ API Key inválida",
                     description="Tu API key es inválida o no tiene los permisos necesarios.",
@@ -1,8 +1,8 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiohttp
 import asyncio
+from utils.gw2_client import GW2Client
 
 # Lista de IDs de los materiales T5
 item_ids = [24294, 24282, 24299, 24275, 24355, 24287, 24349, 24276]
@@ -16,19 +16,16 @@ def calculate_coins(price):
     return f"{gold} <:gold:1328507096324374699> {silver} <:silver:1328507117748879422> {copper} <:Copper:1328507127857418250>"
 
 # Función asincrónica para obtener los detalles de los artículos
-async def get_item_details(item_id):
-    async with aiohttp.ClientSession() as session:
-        item_info_response = await session.get(f"https://api.guildwars2.com/v2/items/{item_id}")
-        price_info_response = await session.get(f"https://api.guildwars2.com/v2/commerce/prices/{item_id}")
-        
-        # Obtener la información y convertirla en JSON
-        item_info = await item_info_response.json()
-        price_info = await price_info_response.json()
-        return item_info, price_info
+async def get_item_details(gw2: GW2Client):
+    # Nombres desde el repositorio de items (en memoria tras la primera consulta) y precios
+    # desde la tabla del poller: ninguna petición por item
+    items, prices = await asyncio.gather(gw2.items.get_many(item_ids), gw2.get_prices(item_ids))
+    return [(items[item_id], prices[item_id]) for item_id in item_ids]
 
 class T5Calculator(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        bot.gw2.market.track(item_ids)
 
     @app_commands.command(name='t5', description='Calculate the price of materials T5')
     async def t5(self, interaction: discord.Interaction):
@@ -36,9 +33,7 @@ class T5Calculator(commands.Cog):
 
         try:
             # Realizar todas las solicitudes de manera asincrónica
-            item_details = await asyncio.gather(
-                *[get_item_details(item_id) for item_id in item_ids]
-            )
+            item_details = await get_item_details(self.bot.gw2)
 
             # Procesar los detalles obtenidos
             item_details = [
@@ -1,31 +1,34 @@
 import discord
 from discord import app_commands
-import aiohttp
 from datetime import datetime
 import asyncio
 import math
+from typing import Optional
+from utils.gw2_client import GW2Client
+from utils.orderbook import OrderBook, walk_total
 
-async def get_gw2_api_data(endpoint: str):
-    """Fetch data from the GW2 API asynchronously"""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f'https://api.guildwars2.com/v2/{endpoint}') as response:
-            if response.status == 200:
-                return await response.json()
-            raise Exception(f"API request failed: {response.status}")
-
-async def get_precio_ecto():
+async def get_precio_ecto(gw2: GW2Client):
     """Get the current price of an Ecto from the GW2 API."""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get('https://api.guildwars2.com/v2/commerce/prices/19721') as response:
-                if response.status == 200:
-                    ecto_data = await response.json()
-                    return ecto_data['sells']['unit_price']
-                raise Exception("Failed to fetch Ecto price.")
+        ecto_data = await gw2.get_price(19721)
+        if ecto_data:
+            return ecto_data['sells']['unit_price']
+        raise Exception("Failed to fetch Ecto price.")
     except Exception as e:
         print(f"Error fetching Ecto price: {e}")
         return None
 
+async def get_order_book(gw2: GW2Client, item_id: int) -> Optional[OrderBook]:
+    """Get the order book of an item, or None so callers fall back to the best price."""
+    try:
+        return await gw2.order_books.get(item_id)
+    except Exception as e:
+        print(f"Error fetching listings for {item_id}: {e}")
+        return None
+
+# T6 material ids
+item_ids = [24295, 24358, 24351, 24357, 24289, 24300, 24283, 24277]
+
 def calculate_coins(price: int) -> str:
     """Convert price to gold, silver, copper format"""
     gold = price // 10000
@@ -34,13 +37,14 @@ def calculate_coins(price: int) -> str:
     return f"{gold} <:gold:1328507096324374699> {silver} <:silver:1328507117748879422> {copper} <:Copper:1328507127857418250>"
 
 class T6(app_commands.Group):
-    def __init__(self):
+    def __init__(self, bot):
         super().__init__(name="t6", description="T6 materials related commands")
+        self.bot = bot
+        bot.gw2.market.track(item_ids + [19721])
 
     @app_commands.command(name="price", description="Calculate the total price of materials T6")
     @app_commands.describe(quantity="Enter a quantity (<= 10 will be multiplied by 250, >= 100 will be used as is)")
     async def price(self, interaction: discord.Interaction, quantity: int):
-        item_ids = [24295, 24358, 24351, 24357, 24289, 24300, 24283, 24277]
         base_stack_size = 250
         
         # Calculate total quantity
@@ -66,7 +70,7 @@ class T6(app_commands.Group):
             price_total_user_90 = int(total_sale_price_user * 0.9)
 
             # Fetch the current Ecto price
-            precio_ecto = await get_precio_ecto()
+            precio_ecto = await get_precio_ecto(self.bot.gw2)
 
             if precio_ecto is None:
                 await interaction.response.send_message("Error al obtener los precios de los Ectos.")
@@ -143,12 +147,20 @@ class T6(app_commands.Group):
 
     async def fetch_item_data(self, item_id: int, total_quantity: int, base_stack_size: int):
         """Fetch item data and calculate prices"""
-        price_data = await get_gw2_api_data(f'commerce/prices/{item_id}')
-        item_data = await get_gw2_api_data(f'items/{item_id}')
-
-        unit_price = price_data.get('sells', {}).get('unit_price', 0)
-        total_price = unit_price * base_stack_size
-        user_total_price = unit_price * total_quantity
+        book, item_data = await asyncio.gather(
+            get_order_book(self.bot.gw2, item_id),
+            self.bot.gw2.items.get(item_id)
+        )
+
+        if book:
+            # Walk the sell listings so large quantities are priced at real depth
+            total_price = walk_total(book.buy_cost(base_stack_size), base_stack_size)
+            user_total_price = walk_total(book.buy_cost(total_quantity), total_quantity)
+        else:
+            price_data = await self.bot.gw2.get_price(item_id) or {}
+            unit_price = price_data.get('sells', {}).get('unit_price', 0)
+            total_price = unit_price * base_stack_size
+            user_total_price = unit_price * total_quantity
 
         return {
             'name': item_data['name'],
@@ -157,4 +169,4 @@ class T6(app_commands.Group):
         }
 
 async def setup(bot):
-    bot.tree.add_command(T6())
+    bot.tree.add_command(T6(bot))
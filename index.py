@@ -6,6 +6,7 @@ import asyncio
 from flask import Flask
 import threading
 from utils.database import DatabaseManager
+from utils.gw2_client import GW2Client
 
 # Flask setup
 app = Flask(__name__)
@@ -37,6 +38,11 @@ class CustomBot(commands.Bot):
         )
         # Initialize database immediately in constructor
         self.db = DatabaseManager()
+        # Cliente HTTP compartido para la API de GW2 y las wikis
+        self.gw2 = GW2Client(
+            price_ttl=float(os.getenv('PRICE_CACHE_TTL', 60)),
+            poll_interval=float(os.getenv('MARKET_POLL_INTERVAL', 120))
+        )
 
     async def setup_hook(self):
         self.remove_command('help')
@@ -54,6 +60,12 @@ class CustomBot(commands.Bot):
         print("Loading cogs...")
         await self.load_cogs()
         print("✅ All cogs loaded")
+
+        # Start the market poller with the ids registered by the cogs
+        extra_ids = os.getenv('MARKET_EXTRA_IDS', '')
+        self.gw2.market.track(int(item_id) for item_id in extra_ids.split(',') if item_id.strip().isdigit())
+        self.gw2.market.start()
+        print(f"✅ Market poller tracking {len(self.gw2.market.tracked)} items")
         
         # Load help extension
         print("Loading help extension...")
@@ -82,6 +94,11 @@ class CustomBot(commands.Bot):
                     import traceback
                     traceback.print_exc()
 
+    async def close(self):
+        await self.gw2.close()
+        self.db.close()
+        await super().close()
+
     async def on_ready(self):
         print(f'✅ Logged in as {self.user.name} ({self.user.id})')
         print(f'🌐 Connected to {len(self.guilds)} servers')
@@ -0,0 +1,58 @@
+import os
+import sys
+
+# Los tests nunca deben tocar Firestore real
+os.environ.setdefault('DATABASE_BACKEND', 'memory')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from types import SimpleNamespace
+
+import pytest
+
+
+class StubResponse:
+    def __init__(self, status, data=None, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._data = data
+
+    async def json(self):
+        return self._data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class StubSession:
+    """aiohttp.ClientSession en memoria: handler(url) retorna (status, data) o (status, data, headers)"""
+
+    closed = False
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return StubResponse(*self.handler(url))
+
+
+@pytest.fixture
+def stub_session():
+    """Fábrica de sesiones en memoria: stub_session(handler)"""
+    return StubSession
+
+
+@pytest.fixture
+def stub_bot():
+    """Fábrica de bots con un GW2Client real sobre una sesión en memoria: stub_bot(handler)"""
+    def make(handler):
+        from utils.gw2_client import GW2Client
+
+        gw2 = GW2Client()
+        gw2._session = StubSession(handler)
+        return SimpleNamespace(gw2=gw2, tree=SimpleNamespace(add_command=lambda command: None))
+    return make
@@ -0,0 +1,115 @@
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("aiohttp")
+
+from cogs.alerta import GW2PriceMonitor, PriceAlertEngine, PriceWatch
+
+
+class StubMonitor:
+    def __init__(self, prices=None, error=None, chart_error=None):
+        self.prices = prices or {}
+        self.error = error
+        self.chart_error = chart_error
+        self.saved = []
+        self.loaded = []
+
+    async def get_current_prices(self, item_ids):
+        if self.error:
+            raise self.error
+        return {item_id: self.prices[item_id] for item_id in item_ids if item_id in self.prices}
+
+    async def save_price_history(self, item_id, price_data):
+        self.saved.append(item_id)
+        return [price_data]
+
+    async def load_price_history(self, item_id, price_data):
+        self.loaded.append(item_id)
+        return [price_data]
+
+    async def create_price_chart(self, item_id, item_name, history, price_type):
+        if self.chart_error:
+            raise self.chart_error
+        return b''
+
+
+class StubUser:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    async def send(self, *args, **kwargs):
+        if self.fail:
+            raise RuntimeError("DMs cerrados")
+        self.sent.append((args, kwargs))
+
+
+def watch(item_id, user=None, target=1000, price_type='sell'):
+    return PriceWatch(user or StubUser(), None, item_id, {}, f'Item {item_id}', target, price_type)
+
+def engine_with(monitor):
+    engine = PriceAlertEngine(monitor)
+
+    async def update_watch(*args):
+        pass
+
+    engine.update_watch = update_watch
+    return engine
+
+
+def test_failed_first_check_removes_the_watch():
+    engine = engine_with(StubMonitor(error=RuntimeError("API caída")))
+
+    async def add():
+        with pytest.raises(RuntimeError):
+            await engine.add(watch(1))
+
+    asyncio.run(add())
+    assert engine.watches == {} and engine.sell_targets == {} and engine.task is None
+
+def test_first_check_does_not_record_history():
+    monitor = StubMonitor(prices={1: {'buy_price': 50, 'sell_price': 5000}})
+    engine = engine_with(monitor)
+
+    async def scenario():
+        await engine.add(watch(1))
+        await engine.check_items(engine.watched_items())
+        engine.task.cancel()
+
+    asyncio.run(scenario())
+    assert monitor.loaded == [1]
+    assert monitor.saved == [1]
+
+def test_failed_error_dm_does_not_abort_the_cycle():
+    prices = {1: {'buy_price': 50, 'sell_price': 5000}, 2: {'buy_price': 50, 'sell_price': 5000}}
+    engine = engine_with(StubMonitor(prices=prices, chart_error=RuntimeError("render")))
+    unreachable, reachable = watch(1, StubUser(fail=True)), watch(2)
+    for entry in (unreachable, reachable):
+        entry.watch_id = next(engine.ids)
+        engine.watches[entry.watch_id] = entry
+        engine.sell_targets.setdefault(entry.item_id, []).append((entry.target_price, entry.watch_id))
+
+    asyncio.run(engine.check_items([1, 2]))
+    assert engine.watches == {}
+    assert reachable.user.sent
+
+def test_close_stops_background_work(tmp_path, monkeypatch):
+    monkeypatch.setenv('PRICE_HISTORY_DB', str(tmp_path / 'history.db'))
+    monkeypatch.setenv('ITEM_CATALOG_PATH', str(tmp_path / 'items.bin'))
+    monitor = GW2PriceMonitor(SimpleNamespace(gw2=None))
+
+    async def scenario():
+        monitor.refresh_task = asyncio.create_task(asyncio.sleep(3600))
+        monitor.alerts.task = asyncio.create_task(asyncio.sleep(3600))
+        await asyncio.sleep(0)
+        monitor.close()
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert monitor.refresh_task.cancelled() and monitor.alerts.task.cancelled()
+    with pytest.raises(sqlite3.ProgrammingError):
+        monitor.history_store._query(1, None, None, None)
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("aiohttp")
+
+from cogs.search import BankIndex, BankSearch
+
+ITEMS = {
+    1: {'id': 1, 'name': 'Steel Ingot', 'rarity': 'Basic'},
+    2: {'id': 2, 'name': 'Darksteel Ingot', 'rarity': 'Basic'},
+    3: {'id': 3, 'name': 'Glob of Ectoplasm', 'rarity': 'Exotic'},
+}
+
+def names(groups):
+    return [group['details']['name'] for group in groups]
+
+def test_search_keeps_mid_word_matches():
+    index = BankIndex([{'id': 1, 'count': 5}, {'id': 2, 'count': 3}], ITEMS)
+
+    # "steel" empieza una palabra en "Steel Ingot" y está a mitad de palabra en "Darksteel Ingot"
+    assert sorted(names(index.search('steel'))) == ['Darksteel Ingot', 'Steel Ingot']
+    assert sorted(names(index.search('teel'))) == ['Darksteel Ingot', 'Steel Ingot']
+
+def test_search_matches_substring_semantics():
+    bank = [{'id': 3, 'count': 1}, None, {'id': 1, 'count': 2}, {'id': 3, 'count': 4}, {'id': 2, 'count': 1}]
+    index = BankIndex(bank, ITEMS)
+
+    for query in ['ingot', 'steel', 'plasm', 'of ecto', 'STEEL', 'zzz', '']:
+        expected = {item['name'] for item in ITEMS.values() if query.lower() in item['name'].lower()}
+        assert set(names(index.search(query))) == expected
+
+    ecto = index.search('ecto')[0]
+    assert ecto['total_quantity'] == 5
+    assert ecto['slots'] == [1, 4]
+
+
+def test_search_matches_localized_names():
+    localized = {1: {'id': 1, 'name': 'Lingote de acero'}, 3: {'id': 3, 'name': 'Pegote de ectoplasma'}}
+    index = BankIndex([{'id': 1, 'count': 5}, {'id': 3, 'count': 2}], ITEMS, localized)
+
+    assert names(index.search('acero')) == ['Steel Ingot']
+    assert names(index.search('ÉCTOPLASMA')) == ['Glob of Ectoplasm']
+    assert names(index.search('ingot')) == ['Steel Ingot']
+
+def bank_api(items_status):
+    def handler(url):
+        if '/account/bank' in url:
+            return 200, [{'id': 1, 'count': 5}, {'id': 999, 'count': 1}]
+        # 206: la API omite el id 999 porque no existe
+        return items_status, [ITEMS[1]] if items_status == 206 else None
+    return handler
+
+def test_unknown_item_ids_do_not_block_snapshot_cache(stub_bot):
+    cog = BankSearch(stub_bot(bank_api(206)))
+    index = asyncio.run(cog.get_bank_index('user', 'key'))
+
+    assert names(index.search('steel')) == ['Steel Ingot']
+    assert cog.snapshots['user'].index is index
+
+def test_failed_item_fetch_is_not_cached(stub_bot):
+    cog = BankSearch(stub_bot(bank_api(500)))
+    asyncio.run(cog.get_bank_index('user', 'key'))
+
+    assert 'user' not in cog.snapshots
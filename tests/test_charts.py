@@ -0,0 +1,25 @@
+import asyncio
+import sys
+
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from utils.charts import ChartRenderer
+
+
+def loaded_modules():
+    names = ('discord', 'flask', 'utils.database', 'matplotlib.figure')
+    return [name for name in names if name in sys.modules]
+
+def test_workers_do_not_preload_the_bot():
+    renderer = ChartRenderer(max_workers=1)
+    try:
+        renderer.start()
+        # Solo lo precargado por el forkserver, nada del proceso del bot
+        assert renderer.executor.submit(loaded_modules).result(timeout=60) == ['matplotlib.figure']
+
+        png = asyncio.run(renderer.render([0, 3600], [1, 2], title="t"))
+        assert png.startswith(b'\x89PNG')
+    finally:
+        renderer.close()
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("firebase_admin")
+
+from utils.database import DatabaseManager, MemoryFirestore
+
+def test_read_started_before_delete_does_not_repopulate_cache():
+    async def scenario():
+        manager = DatabaseManager(client=MemoryFirestore(), max_workers=2)
+        await manager.setApiKey('1', 'old-key')
+        manager.api_key_cache.clear()
+
+        # La lectura obtiene el documento viejo y se queda esperando hasta después del delete
+        collection = manager.apiKeys
+        original_get = collection._get
+        read_done = threading.Event()
+        release = threading.Event()
+
+        def slow_get(doc_id):
+            snapshot = original_get(doc_id)
+            read_done.set()
+            release.wait(5)
+            return snapshot
+
+        collection._get = slow_get
+        read = asyncio.create_task(manager.getApiKey('1'))
+        await asyncio.to_thread(read_done.wait, 5)
+        collection._get = original_get
+
+        assert await manager.deleteApiKey('1')
+        release.set()
+        assert await read == 'old-key'
+
+        # La lectura vieja terminó después del delete: no debe volver a cachear la key
+        assert manager.api_key_cache.get('1') is None
+        assert await manager.getApiKey('1') is None
+        manager.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,20 @@
+import asyncio
+
+from utils.gw2_ids import MAX_IDS_PER_REQUEST, chunked, fetch_ids
+
+
+def test_chunked_respects_request_limit():
+    ids = list(range(2 * MAX_IDS_PER_REQUEST + 1))
+    assert [len(chunk) for chunk in chunked(ids)] == [MAX_IDS_PER_REQUEST, MAX_IDS_PER_REQUEST, 1]
+
+def test_fetch_ids_statuses(stub_session):
+    def fetch(*response):
+        session = stub_session(lambda url: response)
+        return asyncio.run(fetch_ids(session, 'https://api.guildwars2.com/v2/items?ids=1,2'))
+
+    assert fetch(200, [{'id': 1}, {'id': 2}]) == (200, [{'id': 1}, {'id': 2}], None)
+    assert fetch(206, [{'id': 1}]) == (206, [{'id': 1}], None)
+    # 404: ningún id existe, no es un fallo
+    assert fetch(404, None) == (404, [], None)
+    assert fetch(429, None, {'Retry-After': '3'}) == (429, None, 3.0)
+    assert fetch(503, None) == (503, None, None)
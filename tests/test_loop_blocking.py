@@ -0,0 +1,130 @@
+import asyncio
+import socket
+import threading
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("aiohttp")
+
+import cogs.search
+from cogs import t3
+from cogs.clover import ITEMS, CloverCalculator
+from cogs.gemas import GW2Gemas
+from cogs.search import BankSearch
+
+
+def api(url):
+    """Respuestas de la API según la ruta de la URL"""
+    parsed = urlparse(url)
+    path = parsed.path.replace('/v2/', '', 1)
+    ids = [int(item_id) for item_id in parse_qs(parsed.query).get('ids', [''])[0].split(',') if item_id]
+    if path == 'commerce/exchange/coins':
+        return 200, {'coins_per_gem': 2500}
+    if path == 'commerce/exchange/gems':
+        return 200, {'quantity': 190000}
+    if path == 'commerce/prices':
+        return 200, [{'id': item_id, 'sells': {'unit_price': 100}, 'buys': {'unit_price': 90}} for item_id in ids]
+    if path == 'items':
+        return 200, [{'id': item_id, 'name': f'Item {item_id}', 'rarity': 'Fine', 'icon': ''} for item_id in ids]
+    if path == 'account/bank':
+        return 200, [{'id': 19721, 'count': 250}, None, {'id': 24295, 'count': 3}]
+    return 404, None
+
+
+class StubInteraction:
+    def __init__(self):
+        self.user = SimpleNamespace(id=1, display_name='Tester')
+        self.sent = []
+        self._done = False
+        self.response = SimpleNamespace(is_done=lambda: self._done, defer=self._defer,
+                                        send_message=self._send)
+        self.followup = SimpleNamespace(send=self._send)
+
+    async def _defer(self, **kwargs):
+        self._done = True
+
+    async def _send(self, *args, **kwargs):
+        self._done = True
+        self.sent.append(kwargs)
+
+
+@pytest.fixture
+def loop_guard(monkeypatch):
+    """Registra cualquier conexión síncrona abierta desde el hilo del event loop"""
+    state = {'loop_thread': None, 'violations': []}
+
+    def guard(name, original):
+        def wrapper(*args, **kwargs):
+            if threading.get_ident() == state['loop_thread']:
+                state['violations'].append(name)
+                raise AssertionError(f"{name} llamado en el hilo del event loop")
+            return original(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(socket, 'create_connection', guard('socket.create_connection', socket.create_connection))
+    monkeypatch.setattr(socket.socket, 'connect', guard('socket.socket.connect', socket.socket.connect))
+    try:
+        import requests
+    except ImportError:
+        pass
+    else:
+        monkeypatch.setattr(requests.Session, 'request', guard('requests.Session.request', requests.Session.request))
+    return state
+
+
+def run_on_loop(state, coro_factory):
+    async def main():
+        state['loop_thread'] = threading.get_ident()
+        return await coro_factory()
+    return asyncio.run(main())
+
+
+def test_gemas_does_not_block_the_loop(loop_guard, stub_bot):
+    bot = stub_bot(api)
+    interaction = StubInteraction()
+    cog = GW2Gemas(bot)
+    run_on_loop(loop_guard, lambda: GW2Gemas.gemas.callback(cog, interaction, 400))
+
+    assert loop_guard['violations'] == []
+    assert len(bot.gw2.session.urls) == 2
+    assert 'embed' in interaction.sent[0]
+
+
+def test_clover_materials_do_not_block_the_loop(loop_guard, stub_bot):
+    bot = stub_bot(api)
+    result = run_on_loop(loop_guard, lambda: CloverCalculator.calculate_materials(bot.gw2, 2))
+
+    assert loop_guard['violations'] == []
+    assert result['prices']['total'] == 2 * 3 * 100 * 2
+    assert any(str(ITEMS['ECTOPLASM']) in url for url in bot.gw2.session.urls)
+
+
+def test_bank_search_does_not_block_the_loop(loop_guard, monkeypatch, stub_bot):
+    async def get_api_key(user_id):
+        return 'key'
+
+    monkeypatch.setattr(cogs.search.dbManager, 'getApiKey', get_api_key)
+    bot = stub_bot(api)
+    interaction = StubInteraction()
+    run_on_loop(loop_guard, lambda: BankSearch(bot).search_material(interaction, 'item 197'))
+
+    assert loop_guard['violations'] == []
+    embed = interaction.sent[0]['embed']
+    assert [field.name for field in embed.fields] == ['Item 19721 (Fine)']
+
+
+def test_tier_materials_resolve_names_in_one_batch(loop_guard, stub_bot):
+    bot = stub_bot(api)
+
+    async def twice():
+        await t3.get_item_details(bot.gw2)
+        return await t3.get_item_details(bot.gw2)
+
+    details = run_on_loop(loop_guard, twice)
+
+    assert [item['name'] for item, _ in details] == [f'Item {item_id}' for item_id in t3.item_ids]
+    # Una sola petición ?ids= a /v2/items; la segunda llamada sale de memoria
+    assert len([url for url in bot.gw2.session.urls if '/items' in url]) == 1
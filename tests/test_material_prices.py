@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("aiohttp")
+pytest.importorskip("numpy")
+
+from cogs.magic import MATERIALS as MAGIC_MATERIALS, MaterialPriceCalculator as MagicCalculator
+from cogs.might import MATERIALS as MIGHT_MATERIALS, MaterialPriceCalculator as MightCalculator
+
+
+class FailingBooks:
+    async def get(self, item_id):
+        raise RuntimeError("listings unavailable")
+
+
+class StubClient:
+    order_books = FailingBooks()
+
+    async def get_price(self, item_id):
+        return {"sells": {"unit_price": 7}}
+
+
+@pytest.mark.parametrize("calculator, materials", [
+    (MightCalculator, MIGHT_MATERIALS),
+    (MagicCalculator, MAGIC_MATERIALS),
+])
+def test_listings_failure_falls_back_to_best_price(calculator, materials):
+    material = materials[0]
+    result = asyncio.run(calculator.fetch_price_for_material(StubClient(), material))
+    assert result["unitPrice"] == 7
+    assert result["totalPrice"] == 7 * material["stackSize"]
@@ -0,0 +1,17 @@
+from utils.name_index import TrigramIndex
+
+
+def test_search_finds_typos_past_common_trigrams():
+    names = [f"superior rune of the {word}{i}" for i in range(3000) for word in ('pack', 'monk')]
+    names += ['glob of ectoplasm', 'mystic coin']
+    index = TrigramIndex.build(names)
+
+    # " of", "of ", "rune"... aparecen en miles de nombres; el presupuesto los deja fuera
+    assert index.search('glob of ectoplams', n=1, budget=1000) == ['glob of ectoplasm']
+    assert index.search('mystc coin', n=1, budget=1000) == ['mystic coin']
+
+def test_search_matches_difflib_ordering():
+    index = TrigramIndex.build(['ectoplasm', 'glob of ectoplasm', 'ecto'])
+
+    assert index.search('glob of ecto', n=2, cutoff=0.6) == ['glob of ectoplasm']
+    assert index.search('zzzz') == []
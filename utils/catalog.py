@@ -0,0 +1,163 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+MAGIC = b'GW2C'
+VERSION = 1
+HEADER = struct.Struct('<4sIII')  # magic, versión, cantidad de items, cantidad de strings
+COLUMNS = ('id', 'name_en', 'name_es', 'icon', 'rarity', 'type', 'order_en', 'order_es')
+
+class ItemCatalog:
+    """Catálogo compacto de items en disco, abierto con mmap.
+
+    Formato: columnas de enteros de 32 bits de ancho fijo (id ordenado, índices de strings
+    para nombres/icono/rareza/tipo y el orden alfabético por idioma) seguidas de una tabla
+    de strings internados (offsets + blob UTF-8). Nada se deserializa al abrir: cada
+    consulta lee solo las páginas que necesita y varios procesos comparten las mismas páginas.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, string_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Formato de catálogo no soportado: {path}")
+
+        view = memoryview(self._mmap)
+        offset = HEADER.size
+        self._columns = {}
+        for column in COLUMNS:
+            self._columns[column] = view[offset:offset + count * 4].cast('I')
+            offset += count * 4
+        self._string_offsets = view[offset:offset + (string_count + 1) * 4].cast('I')
+        offset += (string_count + 1) * 4
+        self._blob = view[offset:]
+        self.count = count
+
+    @classmethod
+    def open(cls, path: str) -> Optional["ItemCatalog"]:
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    @staticmethod
+    def write(path: str, items: Iterable[dict]):
+        """Escribe el catálogo en un archivo temporal y lo reemplaza de forma atómica.
+
+        Cada item es {'id', 'name_en', 'name_es', 'icon', 'rarity', 'type'}.
+        """
+        rows = sorted(items, key=lambda item: item['id'])
+        strings: Dict[str, int] = {}
+
+        def intern(value) -> int:
+            value = value or ''
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(strings)
+            return index
+
+        columns = {column: array('I') for column in COLUMNS}
+        for item in rows:
+            columns['id'].append(item['id'])
+            for column in ('name_en', 'name_es', 'icon', 'rarity', 'type'):
+                columns[column].append(intern(item.get(column)))
+        for lang in ('en', 'es'):
+            order = sorted(range(len(rows)), key=lambda row: (rows[row].get(f'name_{lang}') or '').lower())
+            columns[f'order_{lang}'].extend(order)
+
+        blob = bytearray()
+        string_offsets = array('I', [0])
+        for value in strings:
+            blob += value.encode('utf-8')
+            string_offsets.append(len(blob))
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(rows), len(strings)))
+            for column in COLUMNS:
+                columns[column].tofile(f)
+            string_offsets.tofile(f)
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        if getattr(self, '_columns', None):
+            self._columns = {}
+            self._string_offsets = self._blob = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # todavía hay vistas en uso; se libera al recolectarse
+            self._mmap = None
+        self._file.close()
+
+    def string(self, index: int) -> str:
+        start, end = self._string_offsets[index], self._string_offsets[index + 1]
+        return bytes(self._blob[start:end]).decode('utf-8')
+
+    def ids(self) -> memoryview:
+        return self._columns['id']
+
+    def row_of(self, item_id: int) -> Optional[int]:
+        ids = self._columns['id']
+        row = bisect_left(ids, item_id)
+        if row < self.count and ids[row] == item_id:
+            return row
+        return None
+
+    def summary(self, row: int) -> dict:
+        """Datos básicos de un item (los detalles completos se piden a la API cuando hacen falta)"""
+        columns = self._columns
+        return {
+            'id': columns['id'][row],
+            'name': self.string(columns['name_en'][row]),
+            'name_es': self.string(columns['name_es'][row]),
+            'icon': self.string(columns['icon'][row]),
+            'rarity': self.string(columns['rarity'][row]),
+            'type': self.string(columns['type'][row])
+        }
+
+    def get(self, item_id: int) -> Optional[dict]:
+        row = self.row_of(item_id)
+        return self.summary(row) if row is not None else None
+
+    def find(self, name: str, lang: str = 'en') -> Optional[int]:
+        """Fila del item cuyo nombre (sin distinguir mayúsculas) es exactamente `name`"""
+        order = self._columns[f'order_{lang}']
+        names = self._columns[f'name_{lang}']
+        name = name.lower()
+        position = bisect_left(order, name, key=lambda row: self.string(names[row]).lower())
+        if position < self.count:
+            row = order[position]
+            if self.string(names[row]).lower() == name:
+                return row
+        return None
+
+    def names(self, lang: str = 'en') -> Iterator[Tuple[int, str]]:
+        """(fila, nombre) de todos los items con nombre en el idioma pedido"""
+        names = self._columns[f'name_{lang}']
+        for row in range(self.count):
+            name = self.string(names[row])
+            if name:
+                yield row, name
+
+    def rows(self) -> Iterator[dict]:
+        for row in range(self.count):
+            item = self.summary(row)
+            yield {
+                'id': item['id'],
+                'name_en': item['name'],
+                'name_es': item['name_es'],
+                'icon': item['icon'],
+                'rarity': item['rarity'],
+                'type': item['type']
+            }
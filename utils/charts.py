@@ -0,0 +1,131 @@
+import asyncio
+import functools
+import hashlib
+import io
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+def render_line_chart(timestamps: List[float], values: List[float], title: str = "", xlabel: str = "",
+                      ylabel: str = "", width: float = 10, height: float = 6, dpi: int = 100) -> bytes:
+    """Dibuja un gráfico de línea y retorna los bytes PNG (se ejecuta en un proceso del pool)"""
+    # API orientada a objetos sobre Agg: sin el estado global de pyplot
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(width, height), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot([datetime.fromtimestamp(ts) for ts in timestamps], values, marker='o')
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.grid(True)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+    return buf.getvalue()
+
+# Módulos que el forkserver importa una sola vez; sin esto precarga __main__ (index.py,
+# que trae discord, Flask y el cliente de Firestore)
+FORKSERVER_PRELOAD = ['utils.charts', 'matplotlib.figure', 'matplotlib.backends.backend_agg']
+
+def _warm_up() -> bool:
+    return True
+
+class ChartRenderer:
+    """Renderiza gráficos en un pool de procesos con concurrencia acotada"""
+
+    def __init__(self, max_workers: int = 2, max_pending: Optional[int] = None):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Limita las solicitudes en vuelo para que una ráfaga no sature el pool
+        self._semaphore = asyncio.Semaphore(max_pending or max_workers * 2)
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            return self._executor
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # Nunca fork: el proceso del bot tiene el event loop, sockets y locks de otros hilos
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(FORKSERVER_PRELOAD)
+        else:
+            context = multiprocessing.get_context('spawn')
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def start(self):
+        """Crea el pool y arranca sus procesos. Bloquea hasta que están listos, así que se
+        llama fuera del event loop (asyncio.to_thread)"""
+        executor = self.executor
+        # Envíos simultáneos: cada uno arranca un proceso nuevo hasta llegar a max_workers
+        for future in [executor.submit(_warm_up) for _ in range(self.max_workers)]:
+            future.result()
+
+    async def render(self, timestamps: List[float], values: List[float], **style) -> bytes:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, functools.partial(render_line_chart, timestamps, values, **style)
+            )
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+def chart_key(*parts) -> str:
+    """Hash estable de todo lo que determina el contenido del gráfico"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+class ChartCache:
+    """Caché LRU de PNGs por hash de contenido, acotado por bytes totales"""
+
+    def __init__(self, renderer: ChartRenderer, max_bytes: int = 32 * 1024 * 1024):
+        self.renderer = renderer
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._rendering: Dict[str, asyncio.Task] = {}
+
+    async def get_or_render(self, key: str, timestamps: List[float], values: List[float], **style) -> bytes:
+        """Retorna el PNG cacheado o lo renderiza una sola vez aunque lo pidan varios a la vez"""
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            return data
+
+        task = self._rendering.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.renderer.render(timestamps, values, **style))
+            self._rendering[key] = task
+            task.add_done_callback(lambda _: self._rendering.pop(key, None))
+        data = await asyncio.shield(task)
+        self.put(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        if len(data) > self.max_bytes:
+            return
+        self._entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
@@ -1,4 +1,11 @@
 import os
+import asyncio
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import firebase_admin
 from firebase_admin import credentials, firestore
@@ -6,8 +13,120 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+class MemoryDocumentSnapshot:
+    """Equivalente en memoria de un DocumentSnapshot de Firestore"""
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+class MemoryDocument:
+    """Equivalente en memoria de un DocumentReference de Firestore"""
+    def __init__(self, collection, doc_id):
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self):
+        return self._collection._get(self.id)
+
+    def set(self, data):
+        self._collection._set(self.id, data)
+
+    def update(self, data):
+        self._collection._update(self.id, data)
+
+    def delete(self):
+        self._collection._delete(self.id)
+
+class MemoryCollection:
+    """Equivalente en memoria de un CollectionReference de Firestore"""
+    def __init__(self, client):
+        self._client = client
+        self._docs = {}
+
+    def document(self, doc_id):
+        return MemoryDocument(self, doc_id)
+
+    def stream(self):
+        self._client._round_trip()
+        with self._client._lock:
+            docs = list(self._docs.items())
+        return [MemoryDocumentSnapshot(doc_id, copy.deepcopy(data)) for doc_id, data in docs]
+
+    def _get(self, doc_id):
+        self._client._round_trip()
+        with self._client._lock:
+            return MemoryDocumentSnapshot(doc_id, copy.deepcopy(self._docs.get(doc_id)))
+
+    def _set(self, doc_id, data):
+        self._client._round_trip()
+        with self._client._lock:
+            self._docs[doc_id] = copy.deepcopy(data)
+
+    def _update(self, doc_id, data):
+        self._client._round_trip()
+        with self._client._lock:
+            if doc_id not in self._docs:
+                raise KeyError(f"Document {doc_id} does not exist")
+            self._docs[doc_id].update(copy.deepcopy(data))
+
+    def _delete(self, doc_id):
+        self._client._round_trip()
+        with self._client._lock:
+            self._docs.pop(doc_id, None)
+
+class MemoryFirestore:
+    """Backend local que imita la API síncrona de Firestore.
+
+    Sirve para medir latencia y throughput sin red: `latency` simula el
+    tiempo de ida y vuelta (bloqueante, como gRPC) de cada operación.
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._collections = {}
+
+    def collection(self, name):
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(self)
+            return self._collections[name]
+
+    def _round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
 class DatabaseManager:
-    def __init__(self):
+    _MISSING = object()
+
+    def __init__(self, client=None, max_workers: int = None, api_key_cache_size: int = None):
+        # Las llamadas de Firestore son bloqueantes: se ejecutan en un pool de hilos acotado
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv('DATABASE_MAX_WORKERS', 8)),
+            thread_name_prefix='firestore'
+        )
+
+        if client is None and os.getenv('DATABASE_BACKEND', 'firestore') == 'memory':
+            client = MemoryFirestore(latency=float(os.getenv('DATABASE_MEMORY_LATENCY', 0)))
+
+        if client is not None:
+            self.db = client
+        else:
+            self.db = self._create_firestore_client()
+        self.apiKeys = self.db.collection('api_keys')
+        self.reminders = self.db.collection('reminders')
+
+        # Caché LRU usuario -> API key (None = el usuario no tiene key)
+        self.api_key_cache = OrderedDict()
+        self.api_key_cache_size = api_key_cache_size or int(os.getenv('APIKEY_CACHE_SIZE', 1024))
+        # Generación por usuario: cada escritura la incrementa y una lectura solo llena el
+        # caché si nadie escribió mientras esperaba a Firestore
+        self.api_key_generations = {}
+
+    def _create_firestore_client(self):
         # Configuración de Firebase usando variables de entorno
         firebase_config = {
             "type": os.getenv('FIREBASE_TYPE'),
@@ -27,15 +146,41 @@ class DatabaseManager:
             self.cred = credentials.Certificate(firebase_config)
             firebase_admin.initialize_app(self.cred)
         
-        self.db = firestore.client()
-        self.apiKeys = self.db.collection('api_keys')
-        self.reminders = self.db.collection('reminders')
+        return firestore.client()
+
+    async def _run(self, func, *args, **kwargs):
+        """Ejecuta una llamada bloqueante de Firestore fuera del event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    def _cache_get(self, userId):
+        value = self.api_key_cache.get(userId, self._MISSING)
+        if value is not self._MISSING:
+            self.api_key_cache.move_to_end(userId)
+        return value
+
+    def _bump_generation(self, userId):
+        generation = self.api_key_generations.get(userId, 0) + 1
+        self.api_key_generations[userId] = generation
+        return generation
+
+    def _cache_put_if_current(self, userId, apiKey, generation):
+        if self.api_key_generations.get(userId, 0) == generation:
+            self._cache_put(userId, apiKey)
+
+    def _cache_put(self, userId, apiKey):
+        self.api_key_cache[userId] = apiKey
+        self.api_key_cache.move_to_end(userId)
+        while len(self.api_key_cache) > self.api_key_cache_size:
+            self.api_key_cache.popitem(last=False)
 
-    # El resto del código permanece exactamente igual
     async def connect(self):
         try:
             doc_ref = self.db.collection('test').document('ping')
-            doc_ref.set({'message': 'ping'})
+            await self._run(doc_ref.set, {'message': 'ping'})
             print('✅ Conectado a Firebase Firestore')
             return True
         except Exception as error:
@@ -43,32 +188,47 @@ class DatabaseManager:
             return False
     
     async def setApiKey(self, userId, apiKey):
+        userId = str(userId)
+        self.api_key_cache.pop(userId, None)
+        generation = self._bump_generation(userId)
         try:
-            doc_ref = self.apiKeys.document(str(userId))
-            doc_ref.set({
+            doc_ref = self.apiKeys.document(userId)
+            await self._run(doc_ref.set, {
                 'api_key': apiKey,
                 'updated_at': datetime.now()
             })
-            print(f"✅ API Key {'añadida' if not doc_ref.get().exists else 'actualizada'} para usuario {userId}")
+            self._cache_put_if_current(userId, apiKey, generation)
+            print(f"✅ API Key guardada para usuario {userId}")
             return True
         except Exception as error:
             print('❌ Error guardando API key:', str(error))
             return False
     
     async def getApiKey(self, userId):
+        userId = str(userId)
+        cached = self._cache_get(userId)
+        if cached is not self._MISSING:
+            return cached
+        generation = self.api_key_generations.get(userId, 0)
         try:
-            doc_ref = self.apiKeys.document(str(userId))
-            doc = doc_ref.get()
+            doc_ref = self.apiKeys.document(userId)
+            doc = await self._run(doc_ref.get)
             print(f"🔍 Buscando API key para usuario {userId}: {'Encontrada' if doc.exists else 'No encontrada'}")
-            return doc.to_dict().get('api_key') if doc.exists else None
+            apiKey = doc.to_dict().get('api_key') if doc.exists else None
+            self._cache_put_if_current(userId, apiKey, generation)
+            return apiKey
         except Exception as error:
             print('❌ Error obteniendo API key:', str(error))
             return None
     
     async def deleteApiKey(self, userId):
+        userId = str(userId)
+        self.api_key_cache.pop(userId, None)
+        generation = self._bump_generation(userId)
         try:
-            doc_ref = self.apiKeys.document(str(userId))
-            doc_ref.delete()
+            doc_ref = self.apiKeys.document(userId)
+            await self._run(doc_ref.delete)
+            self._cache_put_if_current(userId, None, generation)
             print(f"✅ API Key eliminada para usuario {userId}")
             return True
         except Exception as error:
@@ -76,9 +236,15 @@ class DatabaseManager:
             return False
     
     async def hasApiKey(self, userId):
+        userId = str(userId)
+        cached = self._cache_get(userId)
+        if cached is not self._MISSING:
+            return cached is not None
+        generation = self.api_key_generations.get(userId, 0)
         try:
-            doc_ref = self.apiKeys.document(str(userId))
-            doc = doc_ref.get()
+            doc_ref = self.apiKeys.document(userId)
+            doc = await self._run(doc_ref.get)
+            self._cache_put_if_current(userId, doc.to_dict().get('api_key') if doc.exists else None, generation)
             return doc.exists
         except Exception as error:
             print('❌ Error verificando API key:', str(error))
@@ -87,14 +253,8 @@ class DatabaseManager:
     async def setReminder(self, userId, reminderData):
         try:
             reminder_ref = self.reminders.document(str(userId))
-            reminder_ref.set(reminderData)
-            
-            doc = reminder_ref.get()
-            if doc.exists:
-                print(f"✅ Recordatorio guardado correctamente para {userId}: {doc.to_dict()}")
-            else:
-                print(f"❌ El recordatorio no se guardó correctamente para {userId}")
-            
+            await self._run(reminder_ref.set, reminderData)
+            print(f"✅ Recordatorio guardado correctamente para {userId}: {reminderData}")
             return True
         except Exception as error:
             print(f"❌ Error guardando el recordatorio: {str(error)}")
@@ -103,7 +263,7 @@ class DatabaseManager:
     async def getReminder(self, userId):
         try:
             doc_ref = self.reminders.document(str(userId))
-            doc = doc_ref.get()
+            doc = await self._run(doc_ref.get)
             if doc.exists:
                 print(f"🔍 Recordatorio encontrado para {userId}: {doc.to_dict()}")
                 return doc.to_dict()
@@ -117,7 +277,7 @@ class DatabaseManager:
     async def deleteReminder(self, userId):
         try:
             doc_ref = self.reminders.document(str(userId))
-            doc_ref.delete()
+            await self._run(doc_ref.delete)
             print(f"✅ Recordatorio eliminado para {userId}")
             return True
         except Exception as error:
@@ -126,7 +286,7 @@ class DatabaseManager:
     
     async def checkRemindersCollection(self):
         try:
-            docs = self.reminders.stream()
+            docs = await self._run(lambda: list(self.reminders.stream()))
             for doc in docs:
                 print(f"Documento encontrado en reminders: {doc.id} => {doc.to_dict()}")
         except Exception as error:
@@ -135,7 +295,7 @@ class DatabaseManager:
     async def get_all_reminders(self):
         try:
             reminders_list = []
-            docs = self.reminders.stream()
+            docs = await self._run(lambda: list(self.reminders.stream()))
             
             for doc in docs:
                 reminder_data = doc.to_dict()
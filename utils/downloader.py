@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from utils.gw2_ids import chunked, fetch_ids
+
+class AIMDLimiter:
+    """Límite de concurrencia adaptativo: crece de a uno por ventana y se reduce a la mitad ante congestión"""
+
+    def __init__(self, initial: float = 4, minimum: float = 1, maximum: float = 16, target_latency: float = 2.0):
+        self.window = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self.resume_at = 0.0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        while True:
+            delay = self.resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with self._condition:
+                await self._condition.wait_for(lambda: self.in_flight < int(self.window))
+                if time.monotonic() >= self.resume_at:
+                    self.in_flight += 1
+                    return
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency: float):
+        if latency > self.target_latency:
+            self.on_congestion()
+            return
+        # Incremento aditivo: +1 por cada "ventana" completa de respuestas rápidas
+        self.window = min(self.maximum, self.window + 1 / self.window)
+
+    def on_congestion(self, retry_after: Optional[float] = None):
+        now = time.monotonic()
+        if retry_after:
+            self.resume_at = max(self.resume_at, now + retry_after)
+        # Una sola reducción por latencia objetivo aunque fallen varias peticiones en vuelo
+        if now - self._last_decrease >= self.target_latency:
+            self.window = max(self.minimum, self.window / 2)
+            self._last_decrease = now
+
+class CatalogDownloader:
+    """Descarga /v2/items por chunks de 200 ids con un pool de workers y concurrencia AIMD.
+
+    Cada chunk terminado se agrega a un archivo de checkpoint (una línea JSON por chunk),
+    así una descarga interrumpida continúa desde donde quedó.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, checkpoint_path: Optional[str] = None,
+                 limiter: Optional[AIMDLimiter] = None, max_attempts: int = 6):
+        self.session = session
+        self.base_url = base_url
+        self.checkpoint_path = checkpoint_path
+        self.limiter = limiter or AIMDLimiter()
+        self.max_attempts = max_attempts
+
+    def load_checkpoint(self, langs: Iterable[str]) -> Dict[str, Dict[int, dict]]:
+        results = {lang: {} for lang in langs}
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return results
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # última línea cortada por la interrupción
+                if entry['lang'] in results:
+                    for item in entry['items']:
+                        results[entry['lang']][item['id']] = item
+        return results
+
+    def save_chunk(self, lang: str, items: List[dict]):
+        if not self.checkpoint_path:
+            return
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'lang': lang, 'items': items}, ensure_ascii=False) + '\n')
+
+    async def fetch_chunk(self, chunk: List[int], lang: str) -> Tuple[int, Optional[list], Optional[float]]:
+        """Retorna (status, items, retry_after) de una petición ?ids="""
+        return await fetch_ids(self.session, f"{self.base_url}/items?ids={','.join(map(str, chunk))}&lang={lang}")
+
+    async def run(self, item_ids: List[int], langs: Iterable[str] = ('en', 'es'),
+                  transform: Callable[[dict, str], dict] = lambda item, lang: item,
+                  max_workers: Optional[int] = None) -> Dict[str, Dict[int, dict]]:
+        """Descarga los ids que faltan en el checkpoint y retorna {idioma: {id: item transformado}}"""
+        results = self.load_checkpoint(langs)
+        queue: asyncio.Queue = asyncio.Queue()
+        for lang in results:
+            pending = [item_id for item_id in item_ids if item_id not in results[lang]]
+            for chunk in chunked(pending):
+                queue.put_nowait((chunk, lang, 0))
+
+        total = queue.qsize()
+        done = 0
+        failed = 0
+
+        async def worker():
+            nonlocal done, failed
+            while True:
+                try:
+                    chunk, lang, attempt = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self.limiter.acquire()
+                started = time.monotonic()
+                try:
+                    status, items, retry_after = await self.fetch_chunk(chunk, lang)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    status, items, retry_after = None, None, None
+                    print(f"Error en chunk de items ({lang}): {e}")
+                finally:
+                    await self.limiter.release()
+
+                if items is not None:
+                    # Incluye 404 (ninguno de los ids existe): el chunk queda resuelto
+                    self.limiter.on_success(time.monotonic() - started)
+                    compact = [transform(item, lang) for item in items]
+                    for item in compact:
+                        results[lang][item['id']] = item
+                    self.save_chunk(lang, compact)
+                    done += 1
+                    if done % 50 == 0 or done == total:
+                        print(f"Progreso: {done}/{total} chunks (concurrencia {int(self.limiter.window)})")
+                    continue
+
+                # 429, 5xx o error de red: se reduce la ventana y se reintenta más tarde
+                self.limiter.on_congestion(retry_after or 2 ** attempt)
+                if attempt + 1 < self.max_attempts:
+                    queue.put_nowait((chunk, lang, attempt + 1))
+                else:
+                    failed += 1
+                    print(f"Chunk de items ({lang}) descartado tras {self.max_attempts} intentos (status {status})")
+
+        workers = max_workers or int(self.limiter.maximum)
+        # Los reintentos vuelven a la cola, así que se relanzan workers hasta vaciarla
+        while not queue.empty():
+            await asyncio.gather(*[worker() for _ in range(workers)])
+        if failed:
+            print(f"⚠️ {failed} chunks de items no se pudieron descargar")
+        return results
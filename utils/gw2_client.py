@@ -0,0 +1,71 @@
+import asyncio
+import aiohttp
+from typing import Any, Dict, Iterable, Optional
+from utils.prices import MarketPoller, PriceBatcher, PriceCache
+from utils.orderbook import OrderBookCache
+from utils.items import ItemRepository
+
+API_BASE_URL = "https://api.guildwars2.com/v2"
+
+class GW2Client:
+    """Cliente HTTP compartido por todo el bot con un pool de conexiones keep-alive"""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 20,
+                 dns_ttl: int = 300, keepalive_timeout: float = 30, timeout: float = 15,
+                 price_ttl: float = 60, poll_interval: float = 120, orderbook_ttl: float = 30,
+                 item_cache_size: int = 4096):
+        self.base_url = API_BASE_URL
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.prices = PriceBatcher(self)
+        self.price_cache = PriceCache(self.prices, ttl=price_ttl)
+        self.market = MarketPoller(self.prices, interval=poll_interval)
+        self.listings = PriceBatcher(self, endpoint="commerce/listings")
+        self.order_books = OrderBookCache(self.listings, ttl=orderbook_ttl)
+        self.items = ItemRepository(self, max_size=item_cache_size)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Retorna la sesión compartida, creándola dentro del event loop si hace falta"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def get_json(self, endpoint: str, **kwargs) -> Any:
+        """Hace un GET a la API de GW2 (ruta relativa a /v2) y retorna el JSON"""
+        async with self.session.get(f"{self.base_url}/{endpoint.lstrip('/')}", **kwargs) as response:
+            if response.status not in (200, 206):
+                raise Exception(f"API request failed: {response.status}")
+            return await response.json()
+
+    async def get_price(self, item_id: int) -> Optional[dict]:
+        """Precio de un item: primero la tabla del poller, luego el caché con TTL"""
+        return self.market.get(item_id) or await self.price_cache.get(item_id)
+
+    async def get_prices(self, item_ids: Iterable[int]) -> Dict[int, Optional[dict]]:
+        """Precios de varios items: la tabla del poller y, para el resto, una sola petición ?ids="""
+        ids = list(dict.fromkeys(int(item_id) for item_id in item_ids))
+        results = {item_id: self.market.get(item_id) for item_id in ids}
+        missing = [item_id for item_id, price in results.items() if price is None]
+        # Todas las consultas caen en la misma ventana del batcher
+        fetched = await asyncio.gather(*[self.price_cache.get(item_id) for item_id in missing])
+        results.update(zip(missing, fetched))
+        return results
+
+    async def close(self):
+        """Cierra la sesión y todas las conexiones del pool"""
+        await self.market.stop()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,24 @@
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# La API rechaza peticiones ?ids= con más de 200 ids
+MAX_IDS_PER_REQUEST = 200
+
+def chunked(ids: Sequence[int], size: int = MAX_IDS_PER_REQUEST) -> Iterator[Sequence[int]]:
+    """Divide una lista de ids en chunks del tamaño máximo de una petición ?ids="""
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+async def fetch_ids(session, url: str) -> Tuple[int, Optional[List[dict]], Optional[float]]:
+    """Hace un GET a un endpoint ?ids= y retorna (status, entradas, retry_after).
+
+    200 y 206 (algunos ids no existen) traen las entradas; 404 significa que ningún id
+    existe y retorna una lista vacía. Cualquier otro status es un fallo: entradas None y
+    el Retry-After, si la API lo envió.
+    """
+    async with session.get(url) as response:
+        if response.status in (200, 206):
+            return response.status, await response.json(), None
+        if response.status == 404:
+            return response.status, [], None
+        retry_after = response.headers.get('Retry-After')
+        return response.status, None, float(retry_after) if retry_after and retry_after.isdigit() else None
@@ -0,0 +1,63 @@
+import asyncio
+import time
+from typing import Optional
+
+import discord
+
+class LatencyEstimate:
+    """Promedio móvil exponencial de la duración de un comando"""
+
+    def __init__(self, alpha: float = 0.2, initial: float = 0.0):
+        self.alpha = alpha
+        self.value = initial
+
+    def observe(self, seconds: float):
+        self.value += self.alpha * (seconds - self.value)
+
+class AutoDefer:
+    """Responde a una interacción sin pasarse del plazo de 3 s de Discord.
+
+    Si la latencia estimada supera el presupuesto se hace defer de inmediato; si no,
+    un temporizador hace defer al agotarse el presupuesto. `send` usa
+    response.send_message o followup.send según lo que ya haya ocurrido.
+    """
+
+    def __init__(self, interaction: discord.Interaction, budget: float = 2.0,
+                 estimate: Optional[LatencyEstimate] = None, ephemeral: bool = False):
+        self.interaction = interaction
+        self.budget = budget
+        self.estimate = estimate
+        self.ephemeral = ephemeral
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._started = 0.0
+
+    async def __aenter__(self) -> "AutoDefer":
+        self._started = time.monotonic()
+        if self.estimate is not None and self.estimate.value > self.budget:
+            await self.defer()
+        else:
+            self._timer = asyncio.create_task(self._defer_later())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._timer is not None:
+            self._timer.cancel()
+        if self.estimate is not None and exc_type is None:
+            self.estimate.observe(time.monotonic() - self._started)
+
+    async def _defer_later(self):
+        await asyncio.sleep(self.budget)
+        await self.defer()
+
+    async def defer(self):
+        async with self._lock:
+            if not self.interaction.response.is_done():
+                await self.interaction.response.defer(ephemeral=self.ephemeral)
+
+    async def send(self, *args, **kwargs):
+        async with self._lock:
+            if self.interaction.response.is_done():
+                await self.interaction.followup.send(*args, **kwargs)
+            else:
+                await self.interaction.response.send_message(*args, **kwargs)
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.gw2_ids import chunked, fetch_ids
+
+class ItemRepository:
+    """Metadatos de /v2/items compartidos por todo el bot.
+
+    LRU acotado por idioma e id, caché negativo para ids que la API no conoce y
+    resolución de listas con peticiones ?ids= de hasta 200 ids en paralelo.
+    Un id que ya se está pidiendo no se vuelve a pedir.
+    """
+
+    def __init__(self, client, max_size: int = 4096, negative_ttl: float = 3600):
+        self.client = client
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[Tuple[str, int], dict]" = OrderedDict()
+        self._missing: Dict[Tuple[str, int], float] = {}
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+
+    def peek(self, item_id: int, lang: str = 'en') -> Optional[dict]:
+        """Retorna el item si ya está en memoria, sin pedir nada a la API"""
+        key = (lang, int(item_id))
+        item = self._entries.get(key)
+        if item is not None:
+            self._entries.move_to_end(key)
+        return item
+
+    def is_missing(self, item_id: int, lang: str = 'en') -> bool:
+        """True si la API ya respondió que el id no existe (caché negativo vigente)"""
+        return self._missing.get((lang, int(item_id)), 0) > time.monotonic()
+
+    async def get(self, item_id: int, lang: str = 'en') -> Optional[dict]:
+        return (await self.get_many([item_id], lang)).get(int(item_id))
+
+    async def get_many(self, item_ids: Iterable[int], lang: str = 'en') -> Dict[int, Optional[dict]]:
+        """Retorna {id: item o None}; solo los ids desconocidos generan peticiones"""
+        ids = list(dict.fromkeys(int(item_id) for item_id in item_ids))
+        results: Dict[int, Optional[dict]] = {}
+        waiting: Dict[int, asyncio.Future] = {}
+        to_fetch: List[int] = []
+        loop = asyncio.get_running_loop()
+
+        for item_id in ids:
+            key = (lang, item_id)
+            item = self.peek(item_id, lang)
+            if item is not None:
+                results[item_id] = item
+            elif self.is_missing(item_id, lang):
+                results[item_id] = None
+            elif key in self._inflight:
+                waiting[item_id] = self._inflight[key]
+            else:
+                future = self._inflight[key] = loop.create_future()
+                waiting[item_id] = future
+                to_fetch.append(item_id)
+
+        if to_fetch:
+            await asyncio.gather(*[self._fetch_chunk(chunk, lang) for chunk in chunked(to_fetch)])
+
+        for item_id, future in waiting.items():
+            results[item_id] = await future
+        return results
+
+    async def _fetch_chunk(self, chunk: List[int], lang: str):
+        items: Dict[int, dict] = {}
+        # Solo una respuesta válida permite marcar ids como inexistentes
+        failed = True
+        try:
+            url = f"{self.client.base_url}/items?ids={','.join(map(str, chunk))}&lang={lang}"
+            status, data, _ = await fetch_ids(self.client.session, url)
+            if data is not None:
+                items = {item['id']: item for item in data}
+                failed = False
+            else:
+                print(f"Error fetching items: {status}")
+        except Exception as error:
+            print(f"Error fetching items: {error}")
+        finally:
+            expires_at = time.monotonic() + self.negative_ttl
+            for item_id in chunk:
+                key = (lang, item_id)
+                item = items.get(item_id)
+                if item is not None:
+                    self._put(key, item)
+                elif not failed:
+                    self._missing[key] = expires_at
+                future = self._inflight.pop(key)
+                if not future.done():
+                    future.set_result(item)
+
+    def _put(self, key: Tuple[str, int], item: dict):
+        self._entries[key] = item
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
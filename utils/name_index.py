@@ -0,0 +1,127 @@
+import heapq
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Set, Tuple
+
+def normalize(text: str) -> str:
+    """Minúsculas (casefold) y sin acentos: Soñador -> sonador"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).strip()
+
+class TrigramIndex:
+    """Índice invertido de trigramas sobre nombres de items para búsquedas aproximadas rápidas"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @classmethod
+    def build(cls, names: Iterable[str]) -> "TrigramIndex":
+        index = cls()
+        index.update(names)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str):
+        if name in self._ids:
+            return
+        name_id = len(self.names)
+        self.names.append(name)
+        self._ids[name] = name_id
+        for gram in self.trigrams(name):
+            self._postings.setdefault(gram, []).append(name_id)
+
+    def update(self, names: Iterable[str]):
+        for name in names:
+            self.add(name)
+
+    def search(self, query: str, n: int = 5, cutoff: float = 0.8, candidates: int = 50,
+               budget: int = 20000) -> List[str]:
+        """Nombres más parecidos a `query`, ordenados como difflib.get_close_matches"""
+        grams = self.trigrams(query)
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        # Los trigramas muy comunes (" of", "of ") casi no discriminan y recorrer sus listas
+        # domina el costo: se cuentan de los más raros a los más comunes hasta agotar el presupuesto
+        counts = Counter()
+        total = 0
+        for posting in postings:
+            if total and total + len(posting) > budget:
+                break
+            counts.update(posting)
+            total += len(posting)
+        if not counts:
+            return []
+
+        # Preselección por trigramas compartidos (solo los contados), luego coeficiente de Dice
+        # exacto sobre esos candidatos y por último el ratio de difflib
+        pool = heapq.nlargest(candidates * 4, counts, key=counts.__getitem__)
+        scored = heapq.nlargest(
+            candidates,
+            pool,
+            key=lambda name_id: 2 * len(grams & self.trigrams(self.names[name_id]))
+                                / (len(grams) + len(self.names[name_id]) + 1)
+        )
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query)
+        results = []
+        for name_id in scored:
+            matcher.set_seq1(self.names[name_id])
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                ratio = matcher.ratio()
+                if ratio >= cutoff:
+                    results.append((ratio, self.names[name_id]))
+        results.sort(reverse=True)
+        return [name for _, name in results[:n]]
+
+class PrefixIndex:
+    """Arreglos ordenados de nombres para autocompletar por prefijo con bisección.
+
+    Primero se buscan los nombres completos y luego el comienzo de cada palabra,
+    así "ecto" encuentra tanto "Ectoplasm" como "Glob of Ectoplasm".
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str]] = ()):
+        names, words = [], []
+        for display, value in entries:
+            key = normalize(display)
+            names.append((key, display, value))
+            position = key.find(' ')
+            while position != -1:
+                words.append((key[position + 1:], display, value))
+                position = key.find(' ', position + 1)
+        names.sort()
+        words.sort()
+        self._names = names
+        self._name_keys = [entry[0] for entry in names]
+        self._words = words
+        self._word_keys = [entry[0] for entry in words]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, prefix: str, limit: int = 25) -> List[Tuple[str, str]]:
+        """Hasta `limit` pares (nombre, valor) que empiezan por `prefix`, sin valores repetidos"""
+        prefix = normalize(prefix)
+        results, seen = [], set()
+        for keys, rows in ((self._name_keys, self._names), (self._word_keys, self._words)):
+            index = bisect_left(keys, prefix)
+            while index < len(keys) and keys[index].startswith(prefix) and len(results) < limit:
+                _, display, value = rows[index]
+                if value not in seen:
+                    seen.add(value)
+                    results.append((display, value))
+                index += 1
+            if len(results) >= limit:
+                break
+        return results
@@ -0,0 +1,78 @@
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+class Fill(NamedTuple):
+    total: int        # cobre total de las unidades cubiertas por el libro
+    filled: int       # unidades disponibles (<= cantidad pedida)
+    last_price: int   # precio del último nivel tocado
+
+class OrderBook:
+    """Libro de órdenes de un item como arreglos NumPy de precio, cantidad acumulada y costo acumulado.
+
+    Recorrer el libro para cualquier cantidad es una búsqueda binaria (searchsorted)
+    sobre la cantidad acumulada más una resta, O(log n) por consulta.
+    """
+
+    def __init__(self, item_id: int, listings: dict):
+        self.item_id = item_id
+        self.sells = self._side(listings.get('sells', []), descending=False)
+        self.buys = self._side(listings.get('buys', []), descending=True)
+
+    @staticmethod
+    def _side(entries: List[dict], descending: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        prices = np.fromiter((entry['unit_price'] for entry in entries), dtype=np.int64, count=len(entries))
+        quantities = np.fromiter((entry['quantity'] for entry in entries), dtype=np.int64, count=len(entries))
+        order = np.argsort(-prices if descending else prices, kind='stable')
+        prices, quantities = prices[order], quantities[order]
+        return prices, np.cumsum(quantities), np.cumsum(prices * quantities)
+
+    @staticmethod
+    def _walk(side: Tuple[np.ndarray, np.ndarray, np.ndarray], quantity: int) -> Fill:
+        prices, cumulative, costs = side
+        if quantity <= 0 or len(prices) == 0:
+            return Fill(0, 0, 0)
+        if quantity >= cumulative[-1]:
+            return Fill(int(costs[-1]), int(cumulative[-1]), int(prices[-1]))
+        # Primer nivel cuya cantidad acumulada cubre lo pedido
+        level = int(np.searchsorted(cumulative, quantity, side='left'))
+        before_units = int(cumulative[level - 1]) if level else 0
+        before_cost = int(costs[level - 1]) if level else 0
+        return Fill(before_cost + (quantity - before_units) * int(prices[level]), quantity, int(prices[level]))
+
+    def buy_cost(self, quantity: int) -> Fill:
+        """Costo de comprar `quantity` unidades a las órdenes de venta, de la más barata en adelante"""
+        return self._walk(self.sells, quantity)
+
+    def sell_proceeds(self, quantity: int) -> Fill:
+        """Ingreso de vender `quantity` unidades a las órdenes de compra, de la más alta hacia abajo"""
+        return self._walk(self.buys, quantity)
+
+    def top_sells(self, count: int = 5) -> List[Tuple[int, int]]:
+        """(precio, cantidad) de los primeros niveles de venta"""
+        prices, cumulative, _ = self.sells
+        quantities = np.diff(cumulative[:count], prepend=0)
+        return list(zip(prices[:count].tolist(), quantities.tolist()))
+
+def walk_total(fill: Fill, quantity: int) -> int:
+    """Total para `quantity`: si el libro no alcanza, el resto se valora al último precio listado"""
+    return fill.total + (quantity - fill.filled) * fill.last_price
+
+class OrderBookCache:
+    """Snapshots de /v2/commerce/listings por unos segundos, pedidos en lote con ?ids="""
+
+    def __init__(self, batcher, ttl: float = 30):
+        self.batcher = batcher
+        self.ttl = ttl
+        self._entries: Dict[int, Tuple[float, Optional[OrderBook]]] = {}
+
+    async def get(self, item_id: int) -> Optional[OrderBook]:
+        item_id = int(item_id)
+        entry = self._entries.get(item_id)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        listings = await self.batcher.get(item_id)
+        book = OrderBook(item_id, listings) if listings else None
+        self._entries[item_id] = (time.monotonic(), book)
+        return book
@@ -0,0 +1,78 @@
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+class PriceHistoryStore:
+    """Historial de precios en SQLite: inserciones O(1) y consultas por ítem y rango de tiempo"""
+
+    def __init__(self, path: str = "price_history.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL permite lectores concurrentes mientras otro proceso escribe
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS price_history (
+                item_id INTEGER NOT NULL,
+                ts REAL NOT NULL,
+                buy_price INTEGER NOT NULL,
+                sell_price INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_price_history_item_ts ON price_history (item_id, ts)")
+
+    def _append(self, item_id: int, buy_price: int, sell_price: int, ts: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO price_history (item_id, ts, buy_price, sell_price) VALUES (?, ?, ?, ?)",
+                (item_id, ts, buy_price, sell_price)
+            )
+
+    def _query(self, item_id: int, start: Optional[float], end: Optional[float], limit: Optional[int]) -> List[dict]:
+        sql = "SELECT ts, buy_price, sell_price FROM price_history WHERE item_id = ?"
+        params = [item_id]
+        if start is not None:
+            sql += " AND ts >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND ts <= ?"
+            params.append(end)
+        # Con límite se devuelven los últimos puntos, siempre en orden cronológico
+        sql += " ORDER BY ts DESC" if limit else " ORDER BY ts ASC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        if limit:
+            rows.reverse()
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(ts).isoformat(),
+                'buy_price': buy_price,
+                'sell_price': sell_price
+            }
+            for ts, buy_price, sell_price in rows
+        ]
+
+    async def append(self, item_id: int, buy_price: int, sell_price: int, timestamp: Optional[datetime] = None):
+        ts = (timestamp or datetime.now()).timestamp()
+        await asyncio.to_thread(self._append, item_id, buy_price, sell_price, ts)
+
+    async def range(self, item_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    limit: Optional[int] = None) -> List[dict]:
+        """Muestras de un ítem entre `start` y `end` con el mismo formato que el antiguo JSON"""
+        return await asyncio.to_thread(
+            self._query, item_id,
+            start.timestamp() if start else None,
+            end.timestamp() if end else None,
+            limit
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
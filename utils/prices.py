@@ -0,0 +1,181 @@
+import asyncio
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from utils.gw2_ids import chunked, fetch_ids
+
+class PriceBatcher:
+    """Agrupa las consultas a /v2/commerce/prices (u otro endpoint con ?ids=) de todas las interacciones en una sola petición"""
+
+    def __init__(self, client, window: float = 0.005, endpoint: str = "commerce/prices"):
+        self.client = client
+        self.window = window
+        self.endpoint = endpoint
+        self._pending: Dict[int, List[asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def get(self, item_id: int) -> Optional[dict]:
+        """Retorna el precio de un item (o None si no se vende en el Trading Post)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(int(item_id), []).append(future)
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    async def get_many(self, item_ids: Iterable[int]) -> Dict[int, Optional[dict]]:
+        """Retorna los precios de varios items, todos dentro de la misma ventana"""
+        ids = list(dict.fromkeys(int(item_id) for item_id in item_ids))
+        results = await asyncio.gather(*[self.get(item_id) for item_id in ids])
+        return dict(zip(ids, results))
+
+    def _flush(self):
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for ids in chunked(list(pending)):
+            chunk = {item_id: pending[item_id] for item_id in ids}
+            asyncio.ensure_future(self._fetch_chunk(chunk))
+
+    async def _fetch_chunk(self, chunk: Dict[int, List[asyncio.Future]]):
+        try:
+            prices = await self.fetch(chunk.keys())
+        except Exception as error:
+            for futures in chunk.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+            return
+
+        for item_id, futures in chunk.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(prices.get(item_id))
+
+    async def fetch(self, item_ids: Iterable[int]) -> Dict[int, dict]:
+        """Hace una única petición ?ids= (máximo 200 ids) y retorna los precios por id"""
+        ids_str = ','.join(map(str, item_ids))
+        status, data, _ = await fetch_ids(self.client.session, f"{self.client.base_url}/{self.endpoint}?ids={ids_str}")
+        if data is None:
+            raise Exception(f"API request failed: {status}")
+        return {entry['id']: entry for entry in data}
+
+class PriceCache:
+    """Caché de precios por id con TTL que sirve valores algo viejos mientras se refrescan en segundo plano"""
+
+    def __init__(self, batcher: PriceBatcher, ttl: float = 60, max_stale: float = 600):
+        self.batcher = batcher
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._entries: Dict[int, Tuple[float, Optional[dict]]] = {}
+        self._refreshing: Dict[int, asyncio.Task] = {}
+
+    async def get(self, item_id: int) -> Optional[dict]:
+        """Retorna el precio desde el caché; solo espera a la API si no hay un valor utilizable"""
+        item_id = int(item_id)
+        entry = self._entries.get(item_id)
+        if entry is not None:
+            fetched_at, data = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                return data
+            if age < self.max_stale:
+                self._start_refresh(item_id)
+                return data
+        return await asyncio.shield(self._start_refresh(item_id))
+
+    def set(self, item_id: int, data: Optional[dict]):
+        self._entries[int(item_id)] = (time.monotonic(), data)
+
+    def _start_refresh(self, item_id: int) -> asyncio.Task:
+        # Nunca hay dos refrescos en vuelo para el mismo id
+        task = self._refreshing.get(item_id)
+        if task is None:
+            task = asyncio.ensure_future(self._refresh(item_id))
+            self._refreshing[item_id] = task
+        return task
+
+    async def _refresh(self, item_id: int) -> Optional[dict]:
+        try:
+            data = await self.batcher.get(item_id)
+            self.set(item_id, data)
+            return data
+        except Exception as error:
+            print(f"Error refreshing price for {item_id}: {error}")
+            entry = self._entries.get(item_id)
+            if entry is None:
+                raise
+            return entry[1]
+        finally:
+            self._refreshing.pop(item_id, None)
+
+class MarketPoller:
+    """Tarea en segundo plano que mantiene una tabla de precios de los items seguidos"""
+
+    def __init__(self, batcher: PriceBatcher, interval: float = 120):
+        self.batcher = batcher
+        self.interval = interval
+        self.tracked: Set[int] = set()
+        self.updated_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        # Tabla compacta: columnas de enteros y un índice id -> fila
+        self._rows: Dict[int, int] = {}
+        self._buys = array('q')
+        self._buy_qty = array('q')
+        self._sells = array('q')
+        self._sell_qty = array('q')
+
+    def track(self, item_ids: Iterable[int]):
+        self.tracked.update(int(item_id) for item_id in item_ids)
+
+    def get(self, item_id: int) -> Optional[dict]:
+        """Retorna el precio desde la tabla con el mismo formato que la API, o None si no está o es viejo"""
+        row = self._rows.get(item_id)
+        if row is None or not self.is_fresh():
+            return None
+        return {
+            'id': item_id,
+            'buys': {'unit_price': self._buys[row], 'quantity': self._buy_qty[row]},
+            'sells': {'unit_price': self._sells[row], 'quantity': self._sell_qty[row]}
+        }
+
+    def is_fresh(self) -> bool:
+        # Si el poller deja de actualizar, los comandos vuelven a consultar la API
+        return self.updated_at is not None and time.monotonic() - self.updated_at < self.interval * 3
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as error:
+                print(f"❌ Error actualizando la tabla de precios: {error}")
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self):
+        """Descarga todos los ids seguidos con peticiones ?ids= y reemplaza la tabla"""
+        ids = sorted(self.tracked)
+        results = await asyncio.gather(*[self.batcher.fetch(chunk) for chunk in chunked(ids)])
+
+        rows, buys, buy_qty, sells, sell_qty = {}, array('q'), array('q'), array('q'), array('q')
+        for prices in results:
+            for item_id, entry in prices.items():
+                rows[item_id] = len(buys)
+                buys.append(entry.get('buys', {}).get('unit_price', 0))
+                buy_qty.append(entry.get('buys', {}).get('quantity', 0))
+                sells.append(entry.get('sells', {}).get('unit_price', 0))
+                sell_qty.append(entry.get('sells', {}).get('quantity', 0))
+
+        self._rows, self._buys, self._buy_qty, self._sells, self._sell_qty = rows, buys, buy_qty, sells, sell_qty
+        self.updated_at = time.monotonic()